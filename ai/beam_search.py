@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Beam search over placement sequences of the current figure and the
+game preview (see PentrixGame.get_preview)
+"""
+import argparse
+import time
+from collections import namedtuple
+
+from ai import placements
+from ai.placements import get_next_action
+from game import headless, zobrist
+from game.headless import HeadlessEngine
+from game.zobrist import TranspositionTable
+
+SearchNode = namedtuple("SearchNode", ["score",
+                                       "lines_score",
+                                       "board",
+                                       "first_placement"])
+
+SearchStats = namedtuple("SearchStats", ["positions",
+                                         "depth",
+                                         "elapsed",
+                                         "positions_per_second"])
+
+
+def get_board_hash(board):
+    """
+    :return: Zobrist hash of the board line masks, masks of wide lines
+    are mixed in 64-bit chunks
+    """
+    board_hash = 0
+    for line, row in enumerate(board):
+        if row:
+            row_hash = zobrist.mix(line)
+            while row:
+                row_hash = zobrist.mix(row_hash ^ (row & zobrist.HASH_MASK))
+                row >>= 64
+            board_hash ^= row_hash
+    return board_hash
+
+
+class BeamSearchPlayer:
+    """
+    Keeps the beam_width best boards after placing every next figure,
+    boards are scored by the placements heuristic plus the lines
+    cleared on the way to them. Search stops deepening when the time
+    budget (in seconds) is over, the first figure is always searched
+    """
+
+    def __init__(self, weights=None, beam_width=8, time_budget=0.05,
+                 transposition_table=None, clock=time.perf_counter):
+        if beam_width <= 0:
+            raise ValueError("Beam width must be positive!")
+        weights = dict(placements.DEFAULT_WEIGHTS if weights is None
+                       else weights)
+        placements.check_weights(weights)
+        self.weights = weights
+        self._weight_vector = placements.get_weight_vector(weights)
+        self._lines_weight = weights.get("lines_cleared", 0.0)
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+        if transposition_table is None:
+            transposition_table = TranspositionTable()
+        self.transposition_table = transposition_table
+        self.last_stats = None
+        self.total_positions = 0
+        self.total_elapsed = 0.0
+        self._clock = clock
+
+    def search(self, game):
+        """
+        :return: The best Placement of the current figure or None if it
+        can't move
+        """
+        start = self._clock()
+        deadline = start + self.time_budget
+        width = game.grid.width
+        figure = game.current_figure
+        pieces = [(figure, game.current_figure_code, figure.rotation_index,
+                   game.current_figure_x, game.current_figure_y)]
+        for preview_figure, code, x in game.get_preview():
+            figure_width, figure_height = preview_figure.get_size()
+            pieces.append((preview_figure, code, preview_figure.rotation_index,
+                           min(x, width - figure_width), -figure_height))
+        beam = [SearchNode(0.0, 0.0, placements.get_board(game), None)]
+        positions = 0
+        depth = 0
+        for piece in pieces:
+            if depth and self._clock() >= deadline:
+                break
+            next_beam, expanded = self._expand(beam, width, *piece)
+            positions += expanded
+            if not next_beam:
+                break
+            beam = next_beam
+            depth += 1
+        elapsed = self._clock() - start
+        self.total_positions += positions
+        self.total_elapsed += elapsed
+        self.last_stats = SearchStats(
+            positions, depth, elapsed,
+            positions / elapsed if elapsed > 0 else 0.0)
+        if not depth:
+            return None
+        return beam[0].first_placement
+
+    def _expand(self, beam, width, figure, code, rotation_index, x, y):
+        """
+        :return: Best children of the beam nodes and amount of the
+        positions evaluated
+        """
+        children = dict()
+        positions = 0
+        for node in beam:
+            board, node_placements = placements.get_figure_placements(
+                node.board, width, figure, code, rotation_index, x, y)
+            for placement in node_placements:
+                if placement.y < 0:
+                    continue
+                positions += 1
+                new_board, lines_cleared = placements.place(
+                    board, width,
+                    figure.rotation_row_masks[placement.rotation_index],
+                    placement.x, placement.y)
+                lines_score = node.lines_score + \
+                    self._lines_weight * lines_cleared
+                board_hash = get_board_hash(new_board)
+                known = children.get(board_hash)
+                if known is not None and known.lines_score >= lines_score:
+                    continue
+                score = lines_score + self._get_board_score(
+                    new_board, board_hash, width)
+                children[board_hash] = SearchNode(
+                    score, lines_score, new_board,
+                    node.first_placement or placement)
+        best = sorted(children.values(), key=lambda child: child.score,
+                      reverse=True)
+        return best[:self.beam_width], positions
+
+    def _get_board_score(self, board, board_hash, width):
+        """
+        :return: Heuristic score of the board without the lines cleared,
+        cached in the transposition table
+        """
+        score = self.transposition_table.get(board_hash)
+        if score is None:
+            features = placements.get_board_features(board, width)
+            score = sum(weight * value for weight, value
+                        in zip(self._weight_vector, features))
+            self.transposition_table.put(board_hash, score)
+        return score
+
+    @property
+    def positions_per_second(self):
+        """
+        :return: Average search throughput of all the searches
+        """
+        if self.total_elapsed <= 0:
+            return 0.0
+        return self.total_positions / self.total_elapsed
+
+
+class BeamSearchPolicy:
+    """
+    Self-play policy (see game.selfplay) playing the placements found by
+    the beam search, games should be created with a preview_size
+    """
+
+    def __init__(self, weights=None, beam_width=8, time_budget=0.05):
+        self.player = BeamSearchPlayer(weights, beam_width, time_budget)
+        self._placement_key = None
+        self._placement = None
+
+    def __call__(self, game, random_generator):
+        key = (id(game), game.figures_spawned, game.games_lost)
+        if key != self._placement_key:
+            self._placement_key = key
+            self._placement = self.player.search(game)
+        if self._placement is None:
+            return headless.DROP
+        return get_next_action(game, self._placement)
+
+
+def main():
+    parsed_args = parse_args()
+    engine = HeadlessEngine(seed=parsed_args.seed,
+                            grid_width=parsed_args.width,
+                            grid_height=parsed_args.height,
+                            figure_types=set(parsed_args.figure_types),
+                            preview_size=parsed_args.preview)
+    player = BeamSearchPlayer(beam_width=parsed_args.beam_width,
+                              time_budget=parsed_args.time_budget)
+    game = engine.game
+    while game.figures_spawned <= parsed_args.figures \
+            and not game.games_lost:
+        placement = player.search(game)
+        while placement is not None:
+            action = get_next_action(game, placement)
+            figures_spawned = game.figures_spawned
+            engine.step(action)
+            if action == headless.DROP \
+                    or game.figures_spawned != figures_spawned:
+                break
+        if placement is None:
+            engine.step(headless.DROP)
+    print("Score: {}, figures: {}, lost: {}".format(
+        game.last_game_score if game.games_lost else game.score,
+        game.figures_spawned, bool(game.games_lost)))
+    print("Positions: {}, positions/sec: {:.0f}".format(
+        player.total_positions, player.positions_per_second))
+
+
+def parse_args():
+    parse = argparse.ArgumentParser(
+        description="Play a headless game with the beam search")
+    parse.add_argument("-s", "--seed", type=int, default=0,
+                       help="Game seed")
+    parse.add_argument("-n", "--figures", type=int, default=500,
+                       help="Amount of figures to play")
+    parse.add_argument("-f", "--figure_type", type=int, nargs='+',
+                       dest='figure_types', default=[5],
+                       help="Add figure type by size")
+    parse.add_argument("-w", "-W", "--width", type=int, default=15,
+                       help="Game field grid width")
+    parse.add_argument("-H", "--height", type=int, default=30,
+                       help="Game field grid height")
+    parse.add_argument("-k", "--preview", type=int, default=2,
+                       help="Amount of the next figures searched")
+    parse.add_argument("-b", "--beam_width", type=int, default=8,
+                       help="Boards kept after every figure")
+    parse.add_argument("-t", "--time_budget", type=float, default=0.05,
+                       help="Seconds per figure after which the search "
+                            "stops deepening")
+    return parse.parse_args()
+
+
+if __name__ == '__main__':
+    main()
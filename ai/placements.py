@@ -0,0 +1,358 @@
+"""
+Enumeration and heuristic evaluation of the current figure placements.
+Boards are lists of line occupancy bitmasks (see ColorGrid.get_row_masks),
+so placements are tried on copies of ints instead of the live grid
+"""
+from collections import deque, namedtuple
+
+from game import cells, headless
+
+Placement = namedtuple("Placement", ["rotation_index", "x", "y"])
+
+PlacementFeatures = namedtuple("PlacementFeatures", ["lines_cleared",
+                                                     "aggregate_height",
+                                                     "max_height",
+                                                     "holes",
+                                                     "bumpiness"])
+
+DEFAULT_WEIGHTS = {
+    "lines_cleared": 0.76,
+    "aggregate_height": -0.51,
+    "max_height": 0.0,
+    "holes": -0.36,
+    "bumpiness": -0.18,
+}
+
+LOSS_SCORE = float("-inf")
+
+
+def check_weights(weights):
+    unknown = set(weights) - set(PlacementFeatures._fields)
+    if unknown:
+        raise ValueError("Unknown features: {}".format(
+            ", ".join(sorted(unknown))))
+
+
+def get_board(game):
+    """
+    :return: Line masks of the game field without the current figure
+    """
+    board = game.grid.get_row_masks()
+    figure = game.current_figure
+    masks = figure.rotation_row_masks[figure.rotation_index]
+    for dy, mask in enumerate(masks):
+        line = game.current_figure_y + dy
+        if 0 <= line < len(board):
+            board[line] &= ~(mask << game.current_figure_x)
+    return board
+
+
+def fits(board, width, row_masks, x, y):
+    """
+    :return: True if the figure row masks placed on (x, y) are inside
+    the field sides, above its bottom and don't overlap the board,
+    lines above the field are empty
+    """
+    if x < 0 or y + len(row_masks) > len(board):
+        return False
+    for dy, mask in enumerate(row_masks):
+        mask <<= x
+        if mask >> width:
+            return False
+        line = y + dy
+        if line >= 0 and board[line] & mask:
+            return False
+    return True
+
+
+def get_column_masks(board, width):
+    """
+    :return: List of occupancy bitmasks of the columns, bit y is set
+    if the cell (x, y) is not empty
+    """
+    columns = [0] * width
+    for line, row in enumerate(board):
+        while row:
+            lowest = row & -row
+            columns[lowest.bit_length() - 1] |= 1 << line
+            row ^= lowest
+    return columns
+
+
+def get_landing_y(columns, height, bottom_cells, x, y):
+    """
+    Same as ColorGrid.get_drop_distance, but on the column masks
+    (see get_column_masks) of a board with the height
+    :return: y the figure with the bottom cells (see
+    figures.get_bottom_cells) placed on (x, y) lands on
+    """
+    distance = height - y
+    for dx, bottom, gap in bottom_cells:
+        line = y + bottom + 1
+        below = columns[x + dx] >> line if line >= 0 \
+            else columns[x + dx] << -line
+        if gap:
+            # Only a cell in the gap under the point can stop it
+            below &= (1 << gap) - 1
+            if not below:
+                continue
+        if below:
+            distance = min(distance, (below & -below).bit_length() - 1)
+        else:
+            distance = min(distance, height - line)
+    return y + distance
+
+
+def get_reachable_positions(board, width, figure, rotation_index, x, y):
+    """
+    Breadth-first search of the positions the figure can get to from
+    (x, y) by rotating it in place and moving it sideways, the game
+    only rotates to the next rotation, so a rotation that doesn't fit
+    in place may still be reached from another column
+    :return: Dict of the reachable (rotation_index, x) to the headless
+    action starting the shortest way to them, None for the start,
+    empty if the figure doesn't fit on (x, y)
+    """
+    row_masks = figure.rotation_row_masks
+    if not fits(board, width, row_masks[rotation_index], x, y):
+        return dict()
+    rotations_amount = len(row_masks)
+    reachable = {(rotation_index, x): None}
+    queue = deque(reachable)
+    while queue:
+        rotation, column = queue.popleft()
+        first_action = reachable[rotation, column]
+        for action, next_rotation, next_column in (
+                (headless.ROTATE, (rotation + 1) % rotations_amount, column),
+                (headless.LEFT, rotation, column - 1),
+                (headless.RIGHT, rotation, column + 1)):
+            position = (next_rotation, next_column)
+            if position in reachable or not fits(
+                    board, width, row_masks[next_rotation], next_column, y):
+                continue
+            reachable[position] = first_action or action
+            queue.append(position)
+    return reachable
+
+
+def enumerate_placements(board, width, figure, rotation_index, x, y):
+    """
+    Placements of every position reachable from (x, y) (see
+    get_reachable_positions) after dropping the figure
+    :return: List of Placement
+    """
+    columns = get_column_masks(board, width)
+    height = len(board)
+    return [Placement(rotation, column,
+                      get_landing_y(columns, height,
+                                    figure.rotation_bottoms[rotation],
+                                    column, y))
+            for rotation, column in get_reachable_positions(
+                board, width, figure, rotation_index, x, y)]
+
+
+def get_figure_placements(board, width, figure, code, rotation_index, x,
+                          y):
+    """
+    Placements of the figure with the cell code, see enumerate_placements
+    :return: Board the placements are made on and the placements list
+    """
+    if cells.get_kind(code) == cells.ERASER:
+        # Eraser can barely move sideways, it erases its column
+        # on the way down and stops at the field bottom
+        board = [row & ~(1 << x) for row in board]
+        return board, [Placement(rotation_index, x, len(board) - 1)]
+    return board, enumerate_placements(board, width, figure, rotation_index,
+                                       x, y)
+
+
+def place(board, width, row_masks, x, y):
+    """
+    :return: New board with the figure placed on (x, y) and full lines
+    removed, amount of the removed lines
+    """
+    full_mask = (1 << width) - 1
+    board = board[:]
+    for dy, mask in enumerate(row_masks):
+        board[y + dy] |= mask << x
+    lines = [row for row in board if row != full_mask]
+    lines_cleared = len(board) - len(lines)
+    return [0] * lines_cleared + lines, lines_cleared
+
+
+def get_board_features(board, width, lines_cleared=0):
+    """
+    :return: PlacementFeatures of the board
+    """
+    height = len(board)
+    top = 0
+    while top < height and not board[top]:
+        top += 1
+    heights = [0] * width
+    holes = 0
+    seen = 0
+    for line in range(top, height):
+        row = board[line]
+        new = row & ~seen
+        while new:
+            lowest = new & -new
+            heights[lowest.bit_length() - 1] = height - line
+            new ^= lowest
+        holes += bin(seen & ~row).count("1")
+        seen |= row
+    return PlacementFeatures(lines_cleared,
+                             sum(heights),
+                             max(heights),
+                             holes,
+                             sum(abs(heights[column] - heights[column + 1])
+                                 for column in range(width - 1)))
+
+
+def get_placement_features(board, width, row_masks, x, y):
+    """
+    :return: PlacementFeatures of the board after placing the figure
+    and clearing full lines or None if the figure is left above the field
+    """
+    if y < 0:
+        return None
+    board, lines_cleared = place(board, width, row_masks, x, y)
+    return get_board_features(board, width, lines_cleared)
+
+
+def get_weight_vector(weights):
+    """
+    :return: Weights in the order of PlacementFeatures fields
+    """
+    return [weights.get(name, 0.0) for name in PlacementFeatures._fields]
+
+
+def get_column_features(column, height):
+    """
+    :return: Height and amount of holes of the column mask (see
+    get_column_masks) of a board with the height
+    """
+    if not column:
+        return 0, 0
+    column_height = height - (column & -column).bit_length() + 1
+    return column_height, column_height - bin(column).count("1")
+
+
+def evaluate_placements(board, width, figure, placements, weights=None):
+    """
+    Scores all the placements of the figure on the board in one batch:
+    column heights and holes of the board are found once and only the
+    columns the figure lands on are recounted for a placement, the
+    board is copied only for the placements clearing lines
+    :return: List of scores in the order of placements, LOSS_SCORE for
+    the placements leaving the figure above the field
+    """
+    weight_vector = get_weight_vector(
+        DEFAULT_WEIGHTS if weights is None else weights)
+    height = len(board)
+    full_mask = (1 << width) - 1
+    columns = get_column_masks(board, width)
+    column_features = [get_column_features(column, height)
+                       for column in columns]
+    heights = [column_height for column_height, _ in column_features]
+    holes = sum(column_holes for _, column_holes in column_features)
+    # Full lines of the board itself are cleared by any placement
+    board_full = full_mask in board
+    figure_columns = [get_column_masks(row_masks,
+                                       max(row_masks).bit_length())
+                      for row_masks in figure.rotation_row_masks]
+    scores = list()
+    for rotation, x, y in placements:
+        if y < 0:
+            scores.append(LOSS_SCORE)
+            continue
+        row_masks = figure.rotation_row_masks[rotation]
+        if board_full or any((board[y + dy] | mask << x) == full_mask
+                             for dy, mask in enumerate(row_masks)):
+            features = get_placement_features(board, width, row_masks, x, y)
+        else:
+            placement_heights = heights[:]
+            placement_holes = holes
+            for dx, figure_column in enumerate(figure_columns[rotation]):
+                column_height, column_holes = get_column_features(
+                    columns[x + dx] | figure_column << y, height)
+                placement_heights[x + dx] = column_height
+                placement_holes += column_holes - column_features[x + dx][1]
+            features = PlacementFeatures(
+                0,
+                sum(placement_heights),
+                max(placement_heights),
+                placement_holes,
+                sum(abs(placement_heights[column] -
+                        placement_heights[column + 1])
+                    for column in range(width - 1)))
+        scores.append(sum(weight * value for weight, value
+                          in zip(weight_vector, features)))
+    return scores
+
+
+class PlacementEvaluator:
+    """
+    Finds the best current figure placement for a game by a linear
+    heuristic over PlacementFeatures
+    """
+
+    def __init__(self, weights=None):
+        weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        check_weights(weights)
+        self.weights = weights
+
+    def evaluate(self, game):
+        """
+        :return: List of (score, Placement) sorted from the best
+        """
+        figure = game.current_figure
+        board, placements = get_figure_placements(
+            get_board(game), game.grid.width, figure,
+            game.current_figure_code, figure.rotation_index,
+            game.current_figure_x, game.current_figure_y)
+        scores = evaluate_placements(board, game.grid.width, figure,
+                                     placements, self.weights)
+        return sorted(zip(scores, placements),
+                      key=lambda scored: scored[0], reverse=True)
+
+    def get_best_placement(self, game):
+        """
+        :return: The best Placement or None if the figure can't move
+        """
+        evaluated = self.evaluate(game)
+        return evaluated[0][1] if evaluated else None
+
+
+def get_next_action(game, placement):
+    """
+    :return: headless action starting the shortest way of the current
+    figure to the placement (see get_reachable_positions), the drop when
+    it is there or can't get there anymore
+    """
+    figure = game.current_figure
+    first_actions = get_reachable_positions(
+        get_board(game), game.grid.width, figure, figure.rotation_index,
+        game.current_figure_x, game.current_figure_y)
+    return first_actions.get((placement.rotation_index, placement.x)) \
+        or headless.DROP
+
+
+class PlacementPolicy:
+    """
+    Self-play policy (see game.selfplay) playing the best placement of
+    every figure, the placement is chosen once per figure
+    """
+
+    def __init__(self, weights=None):
+        self.evaluator = PlacementEvaluator(weights)
+        self._placement_key = None
+        self._placement = None
+
+    def __call__(self, game, random_generator):
+        key = (id(game), game.figures_spawned, game.games_lost)
+        if key != self._placement_key:
+            self._placement_key = key
+            self._placement = self.evaluator.get_best_placement(game)
+        if self._placement is None:
+            return headless.DROP
+        return get_next_action(game, self._placement)
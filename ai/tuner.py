@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Cross-entropy tuning of the placement heuristic weights for a game
+configuration, candidates are played on a process pool
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from ai.placements import DEFAULT_WEIGHTS, PlacementPolicy, check_weights
+from game.selfplay import derive_seeds, play_game
+
+CHECKPOINT_VERSION = 1
+
+GenerationResult = namedtuple("GenerationResult", ["generation",
+                                                   "mean_score",
+                                                   "elite_score",
+                                                   "best_score",
+                                                   "best_weights"])
+
+
+def evaluate_weights(weights, seeds, game_kwargs=None, max_steps=2000,
+                     gravity=4):
+    """
+    :return: Average score of the placement policy with the weights
+    over the games with the seeds
+    """
+    policy = PlacementPolicy(weights)
+    return statistics.mean(
+        play_game(seed, game_kwargs, max_steps, gravity, policy).score
+        for seed in seeds)
+
+
+class CrossEntropyTuner:
+    """
+    Keeps a normal distribution of every weight, each generation samples
+    population_size candidates, plays games_per_candidate games (the same
+    seeds for all candidates) with each of them and moves the
+    distribution to the elite_fraction of the best candidates.
+    If checkpoint_path is set, the state is saved after every generation
+    and loaded back on creation
+    """
+
+    def __init__(self, game_kwargs=None, feature_names=None,
+                 population_size=32, elite_fraction=0.25,
+                 games_per_candidate=4, max_steps=2000, gravity=4,
+                 initial_std=0.5, extra_noise=0.1, seed=0, workers=None,
+                 checkpoint_path=None):
+        if population_size < 2:
+            raise ValueError("Population must contain at least 2 "
+                             "candidates!")
+        if not 0 < elite_fraction <= 1:
+            raise ValueError("Elite fraction must be in (0, 1]!")
+        if games_per_candidate <= 0:
+            raise ValueError("Amount of games must be positive!")
+        feature_names = list(feature_names or DEFAULT_WEIGHTS)
+        check_weights(feature_names)
+        self.game_kwargs = dict(game_kwargs or dict())
+        self.feature_names = feature_names
+        self.population_size = population_size
+        self.elite_size = max(1, round(population_size * elite_fraction))
+        self.games_per_candidate = games_per_candidate
+        self.max_steps = max_steps
+        self.gravity = gravity
+        self.extra_noise = extra_noise
+        self.seed = seed
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path
+        self.generation = 0
+        self.means = [DEFAULT_WEIGHTS.get(name, 0.0) for name in feature_names]
+        self.stds = [initial_std] * len(feature_names)
+        self.best_score = None
+        self.best_weights = None
+        self.history = list()
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self.load_checkpoint()
+
+    def sample_population(self):
+        """
+        :return: List of weight dicts of the current generation
+        """
+        generator = random.Random(hash((self.seed, self.generation)))
+        return [{name: generator.gauss(mean, std)
+                 for name, mean, std in zip(self.feature_names, self.means,
+                                            self.stds)}
+                for _ in range(self.population_size)]
+
+    def evaluate_population(self, population):
+        """
+        :return: List of average scores of the candidates
+        """
+        seeds = derive_seeds(hash((self.seed, self.generation)),
+                             self.games_per_candidate)
+        evaluate = partial(evaluate_weights, seeds=seeds,
+                           game_kwargs=self.game_kwargs,
+                           max_steps=self.max_steps, gravity=self.gravity)
+        if self.workers == 1:
+            return list(map(evaluate, population))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(evaluate, population))
+
+    def step(self):
+        """
+        Plays one generation and updates the distribution
+        :return: GenerationResult of the generation
+        """
+        population = self.sample_population()
+        scores = self.evaluate_population(population)
+        ranked = sorted(zip(scores, range(len(population))), reverse=True)
+        elite = [population[index] for score, index
+                 in ranked[:self.elite_size]]
+        noise = self.extra_noise / (self.generation + 1)
+        for i, name in enumerate(self.feature_names):
+            values = [weights[name] for weights in elite]
+            self.means[i] = statistics.mean(values)
+            spread = statistics.pstdev(values)
+            self.stds[i] = (spread * spread + noise) ** 0.5
+        top_score, top_index = ranked[0]
+        if self.best_score is None or top_score > self.best_score:
+            self.best_score = top_score
+            self.best_weights = population[top_index]
+        result = GenerationResult(
+            self.generation, statistics.mean(scores),
+            statistics.mean(score for score, index
+                            in ranked[:self.elite_size]),
+            self.best_score, dict(self.best_weights))
+        self.history.append(result)
+        self.generation += 1
+        if self.checkpoint_path:
+            self.save_checkpoint()
+        return result
+
+    def run(self, generations):
+        """
+        Plays generations until their total amount reaches generations
+        :return: Generator of GenerationResult of the played generations
+        """
+        while self.generation < generations:
+            yield self.step()
+
+    def get_state(self):
+        return {"version": CHECKPOINT_VERSION,
+                "game_kwargs": _get_json_game_kwargs(self.game_kwargs),
+                "feature_names": self.feature_names,
+                "generation": self.generation,
+                "means": self.means,
+                "stds": self.stds,
+                "best_score": self.best_score,
+                "best_weights": self.best_weights,
+                "history": [result._asdict() for result in self.history]}
+
+    def save_checkpoint(self):
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump(self.get_state(), file, indent=1)
+            os.replace(temp_path, self.checkpoint_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def load_checkpoint(self):
+        with open(self.checkpoint_path) as file:
+            state = json.load(file)
+        if state.get("version") != CHECKPOINT_VERSION \
+                or state["game_kwargs"] != _get_json_game_kwargs(
+                    self.game_kwargs) \
+                or state["feature_names"] != self.feature_names:
+            raise ValueError("{} is a checkpoint of another tuning".format(
+                self.checkpoint_path))
+        self.generation = state["generation"]
+        self.means = state["means"]
+        self.stds = state["stds"]
+        self.best_score = state["best_score"]
+        self.best_weights = state["best_weights"]
+        self.history = [GenerationResult(**result)
+                        for result in state["history"]]
+
+
+def _get_json_game_kwargs(game_kwargs):
+    """
+    :return: Game arguments as they look after a JSON round trip
+    """
+    return json.loads(json.dumps(
+        {name: sorted(value) if isinstance(value, (set, frozenset))
+         else value for name, value in game_kwargs.items()}))
+
+
+def main():
+    parsed_args = parse_args()
+    game_kwargs = dict(grid_width=parsed_args.width,
+                       grid_height=parsed_args.height,
+                       figure_types=set(parsed_args.figure_types),
+                       eraser_enabled=parsed_args.eraser,
+                       time_bomb_enabled=parsed_args.time_bomb,
+                       color_lines_enabled=parsed_args.color_lines)
+    tuner = CrossEntropyTuner(game_kwargs,
+                              population_size=parsed_args.population,
+                              games_per_candidate=parsed_args.games,
+                              max_steps=parsed_args.max_steps,
+                              seed=parsed_args.seed,
+                              workers=parsed_args.workers,
+                              checkpoint_path=parsed_args.checkpoint)
+    for result in tuner.run(parsed_args.generations):
+        print("Generation {0.generation}: mean {0.mean_score:.1f}, "
+              "elite {0.elite_score:.1f}, best {0.best_score:.1f}".format(
+                  result))
+    print(json.dumps(tuner.best_weights, indent=1))
+
+
+def parse_args():
+    parse = argparse.ArgumentParser(
+        description="Tune the placement heuristic weights")
+    parse.add_argument("-f", "--figure_type", type=int, nargs='+',
+                       dest='figure_types', default=[5],
+                       help="Add figure type by size")
+    parse.add_argument("-w", "-W", "--width", type=int, default=15,
+                       help="Game field grid width")
+    parse.add_argument("-H", "--height", type=int, default=30,
+                       help="Game field grid height")
+    parse.add_argument("-e", "--eraser", action="store_true",
+                       help="Enabling eraser figure")
+    parse.add_argument("-t", "--time_bomb", action="store_true",
+                       help="Enabling time bombs")
+    parse.add_argument("-c", "--color_lines", action="store_true",
+                       help="Enabling color lines")
+    parse.add_argument("-g", "--generations", type=int, default=10,
+                       help="Total amount of generations")
+    parse.add_argument("-p", "--population", type=int, default=32,
+                       help="Candidates in a generation")
+    parse.add_argument("-n", "--games", type=int, default=4,
+                       help="Games played by every candidate")
+    parse.add_argument("--max_steps", type=int, default=2000,
+                       help="Maximal amount of actions in a game")
+    parse.add_argument("-s", "--seed", type=int, default=0,
+                       help="Seed of the candidates and the games")
+    parse.add_argument("-j", "--workers", type=int, default=None,
+                       help="Amount of worker processes (all cores by "
+                            "default)")
+    parse.add_argument("--checkpoint", type=str, default=None,
+                       help="JSON file the tuning is saved to after every "
+                            "generation and resumed from")
+    return parse.parse_args()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Micro and macro benchmarks of the game engine and the field canvas.
+Every benchmark gets an amount of loops and a clock and returns the
+seconds its measured part took, so preparation of the field is not
+measured. Results are written to JSON and compared with a baseline
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from collections import OrderedDict, namedtuple
+from functools import partial
+
+from game import cells
+from game.figures import generate_figures_cleared
+from game.generated_figures import get_available_figure_sizes
+from game.pentrix_game import PentrixGame
+
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 0.1
+DEFAULT_MAX_FIGURE_SIZE = 7
+
+BenchmarkResult = namedtuple("BenchmarkResult", ["loops",
+                                                 "best",
+                                                 "median"])
+
+Regression = namedtuple("Regression", ["name",
+                                       "baseline",
+                                       "current",
+                                       "ratio"])
+
+
+class BenchmarkSkipped(Exception):
+    pass
+
+
+def create_game(**kwargs):
+    """
+    :return: Seeded game on the default field without random erasers
+    and bombs
+    """
+    game_kwargs = dict(seed=0, eraser_enabled=False, time_bomb_enabled=False)
+    game_kwargs.update(kwargs)
+    return PentrixGame(**game_kwargs)
+
+
+def get_color_code(game, kind=cells.NORMAL, color_number=0, timer=0):
+    """
+    :return: Cell code of the kind with the game color number color_number
+    """
+    color_index = game.grid.palette.get_index(game.cell_colors[color_number])
+    return cells.encode(kind, color_index, timer)
+
+
+def fill_lines(grid, lines, code, hole_x=None):
+    for y in lines:
+        for x in range(grid.width):
+            grid.set_code(x, y, cells.EMPTY if x == hole_x else code)
+
+
+def bench_try_move(loops, clock):
+    """
+    One loop is a move to the left and back
+    """
+    game = create_game()
+    for _ in range(10):
+        game.loop()
+    start = clock()
+    for _ in range(loops):
+        game._try_move(-1, 0)
+        game._try_move(1, 0)
+    return clock() - start
+
+
+def bench_try_rotate(loops, clock):
+    game = create_game()
+    for _ in range(10):
+        game.loop()
+    start = clock()
+    for _ in range(loops):
+        game.try_rotate()
+    return clock() - start
+
+
+def bench_drop_current_figure(loops, clock):
+    """
+    Drops of a seeded game, the game restarts when it is lost
+    """
+    game = create_game()
+    start = clock()
+    for _ in range(loops):
+        game.drop_current_figure()
+    return clock() - start
+
+
+def bench_check_for_completed_lines(loops, clock):
+    """
+    Removal of a field full of lines except the top one
+    """
+    game = create_game(color_lines_enabled=True)
+    grid = game.grid
+    code = get_color_code(game)
+    lines = range(1, grid.height)
+    elapsed = 0.0
+    for _ in range(loops):
+        fill_lines(grid, lines, code)
+        start = clock()
+        game.check_for_completed_lines()
+        elapsed += clock() - start
+    return elapsed
+
+
+def bench_time_bomb_chain(loops, clock):
+    """
+    update_time_bombs exploding a bottom line of bombs over a field
+    of lines with holes
+    """
+    game = create_game(time_bomb_enabled=True)
+    grid = game.grid
+    code = get_color_code(game)
+    bottom = grid.height - 1
+    elapsed = 0.0
+    for _ in range(loops):
+        fill_lines(grid, range(bottom - 4, bottom), code, hole_x=0)
+        for x in range(grid.width):
+            grid.set_code(x, bottom, get_color_code(game, cells.TIME_BOMB,
+                                                    timer=1 if x == 0 else 4))
+        start = clock()
+        game.update_time_bombs()
+        elapsed += clock() - start
+    return elapsed
+
+
+def bench_snapshot_restore(loops, clock):
+    """
+    One loop is a snapshot of a game in progress and its restore
+    """
+    game = create_game()
+    for _ in range(40):
+        game.drop_current_figure()
+    start = clock()
+    for _ in range(loops):
+        game.restore(game.get_snapshot())
+    return clock() - start
+
+
+def bench_generate_figures(loops, clock, figure_size):
+    start = clock()
+    for _ in range(loops):
+        generate_figures_cleared(figure_size)
+    return clock() - start
+
+
+def _create_canvas():
+    """
+    :return: Tk root and a game field canvas on it, the root window
+    is never shown
+    """
+    try:
+        from tkinter import TclError, Tk
+        from gui.grid_canvas import ResizableGridCanvas
+    except ImportError as error:
+        raise BenchmarkSkipped(str(error))
+    try:
+        root = Tk()
+    except TclError as error:
+        raise BenchmarkSkipped(str(error))
+    root.withdraw()
+    game = create_game()
+    canvas = ResizableGridCanvas(root, game.grid, width=451, height=901)
+    return root, game, canvas
+
+
+def bench_redraw_full(loops, clock):
+    """
+    Rebuild of the canvas items and redraw of the whole field with every
+    cell changed
+    """
+    root, game, canvas = _create_canvas()
+    grid = game.grid
+    codes = [get_color_code(game, color_number=number)
+             for number in range(2)]
+    try:
+        elapsed = 0.0
+        for loop in range(loops):
+            fill_lines(grid, range(grid.height), codes[loop % 2])
+            start = clock()
+            canvas.rebuild()
+            root.update_idletasks()
+            elapsed += clock() - start
+        return elapsed
+    finally:
+        root.destroy()
+
+
+def bench_redraw_move(loops, clock):
+    """
+    One loop is a figure move to the left and back, each followed
+    by a redraw of the changed cells
+    """
+    root, game, canvas = _create_canvas()
+    game.subscribe(canvas.apply_changes)
+    for _ in range(10):
+        game.loop()
+    canvas.redraw()
+    try:
+        start = clock()
+        for _ in range(loops):
+            game.try_move_left()
+            canvas.redraw()
+            game.try_move_right()
+            canvas.redraw()
+            root.update_idletasks()
+        return clock() - start
+    finally:
+        root.destroy()
+
+
+def get_benchmarks(max_figure_size=DEFAULT_MAX_FIGURE_SIZE):
+    """
+    :return: OrderedDict of the benchmarks by name
+    """
+    benchmarks = OrderedDict([
+        ("try_move", bench_try_move),
+        ("try_rotate", bench_try_rotate),
+        ("drop_current_figure", bench_drop_current_figure),
+        ("check_for_completed_lines", bench_check_for_completed_lines),
+        ("time_bomb_chain", bench_time_bomb_chain),
+        ("snapshot_restore", bench_snapshot_restore),
+    ])
+    for figure_size in get_available_figure_sizes():
+        if figure_size <= max_figure_size:
+            benchmarks["generate_figures_cleared_{}".format(figure_size)] = \
+                partial(bench_generate_figures, figure_size=figure_size)
+    benchmarks["redraw_full"] = bench_redraw_full
+    benchmarks["redraw_move"] = bench_redraw_move
+    return benchmarks
+
+
+def measure(benchmark, repeats=5, min_time=0.1, clock=time.perf_counter):
+    """
+    Doubles the loops until a run takes min_time seconds, then runs
+    the benchmark repeats times more
+    :return: BenchmarkResult with the best and median seconds per loop
+    """
+    if repeats <= 0:
+        raise ValueError("Amount of repeats must be positive!")
+    loops = 1
+    while benchmark(loops, clock) < min_time:
+        loops *= 2
+    samples = [benchmark(loops, clock) / loops for _ in range(repeats)]
+    return BenchmarkResult(loops, min(samples), statistics.median(samples))
+
+
+def run_benchmarks(benchmarks, repeats=5, min_time=0.1, log=None):
+    """
+    :return: Results dict ready to be written to JSON, skipped benchmarks
+    are listed with their reasons
+    """
+    results = OrderedDict()
+    skipped = OrderedDict()
+    for name, benchmark in benchmarks.items():
+        try:
+            result = measure(benchmark, repeats, min_time)
+        except BenchmarkSkipped as error:
+            skipped[name] = str(error)
+            if log:
+                log("{}: skipped ({})".format(name, error))
+            continue
+        results[name] = result._asdict()
+        if log:
+            log("{}: {:.3f} us".format(name, result.best * 1e6))
+    return {"version": RESULTS_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "benchmarks": results,
+            "skipped": skipped}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares the best times of the benchmarks present in both results
+    :return: List of Regression slower than the baseline by more than
+    the threshold fraction
+    """
+    if threshold < 0:
+        raise ValueError("Threshold can't be negative!")
+    regressions = list()
+    baseline_benchmarks = baseline["benchmarks"]
+    for name, result in results["benchmarks"].items():
+        if name not in baseline_benchmarks:
+            continue
+        baseline_best = baseline_benchmarks[name]["best"]
+        ratio = result["best"] / baseline_best
+        if ratio > 1 + threshold:
+            regressions.append(Regression(name, baseline_best,
+                                          result["best"], ratio))
+    return regressions
+
+
+def read_results(path):
+    with open(path) as file:
+        results = json.load(file)
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError("{} has unknown results version".format(path))
+    return results
+
+
+def write_results(results, path):
+    with open(path, "w") as file:
+        json.dump(results, file, indent=1)
+
+
+def main():
+    parsed_args = parse_args()
+    benchmarks = get_benchmarks(parsed_args.max_figure_size)
+    if parsed_args.names:
+        unknown = set(parsed_args.names) - set(benchmarks)
+        if unknown:
+            sys.exit("Unknown benchmarks: {}".format(
+                ", ".join(sorted(unknown))))
+        benchmarks = OrderedDict((name, benchmarks[name])
+                                 for name in parsed_args.names)
+    results = run_benchmarks(benchmarks, parsed_args.repeats,
+                             parsed_args.min_time, log=print)
+    if parsed_args.output:
+        write_results(results, parsed_args.output)
+    if not parsed_args.baseline:
+        return
+    regressions = compare(results, read_results(parsed_args.baseline),
+                          parsed_args.threshold)
+    for regression in regressions:
+        print("Regression in {0.name}: {1:.3f} us -> {2:.3f} us "
+              "(x{0.ratio:.2f})".format(regression,
+                                        regression.baseline * 1e6,
+                                        regression.current * 1e6))
+    if regressions:
+        sys.exit(1)
+    print("No regressions over {:.0%}".format(parsed_args.threshold))
+
+
+def parse_args():
+    parse = argparse.ArgumentParser(
+        description="Benchmark the game engine and compare the results "
+                    "with a baseline",
+        epilog="Baselines depend on the machine, save one with "
+               "'-o benchmarks/baseline.json' before a change and compare "
+               "with it by '-b benchmarks/baseline.json' after")
+    parse.add_argument("names", nargs="*",
+                       help="Benchmarks to run (all by default)")
+    parse.add_argument("-o", "--output", type=str, default=None,
+                       help="JSON file to write the results to")
+    parse.add_argument("-b", "--baseline", type=str, default=None,
+                       help="JSON results to compare with, exits with 1 "
+                            "on regressions")
+    parse.add_argument("-t", "--threshold", type=float,
+                       default=DEFAULT_THRESHOLD,
+                       help="Allowed slowdown fraction")
+    parse.add_argument("-r", "--repeats", type=int, default=5,
+                       help="Measurements of every benchmark")
+    parse.add_argument("--min_time", type=float, default=0.1,
+                       help="Minimal seconds of a measurement")
+    parse.add_argument("--max_figure_size", type=int,
+                       default=DEFAULT_MAX_FIGURE_SIZE,
+                       help="The largest figure size generated")
+    return parse.parse_args()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""
+Tests use a temporary figure catalog instead of ~/.cache/pentrix
+"""
+import os
+import shutil
+import tempfile
+
+_catalog_directory = tempfile.mkdtemp(prefix="pentrix-catalog-")
+os.environ["PENTRIX_CATALOG_DIR"] = _catalog_directory
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_catalog_directory, ignore_errors=True)
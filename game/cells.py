@@ -0,0 +1,110 @@
+"""
+Integer cell codes: kind in bits 0-2, bomb timer in bits 3-5
+and color palette index in bits 6-15, 0 is an empty cell
+"""
+
+EMPTY = 0
+
+NORMAL = 1
+RAINBOW = 2
+ERASER = 3
+TIME_BOMB = 4
+
+KIND_MASK = 0b111
+TIMER_SHIFT = 3
+TIMER_MASK = 0b111
+COLOR_SHIFT = 6
+MAX_COLORS = 1 << (16 - COLOR_SHIFT)
+
+RAINBOW_CODE = RAINBOW
+
+
+def encode(kind, color_index=0, timer=0):
+    if not 0 <= timer <= TIMER_MASK:
+        raise ValueError("Timer must be between 0 and {}!".format(TIMER_MASK))
+    return kind | timer << TIMER_SHIFT | color_index << COLOR_SHIFT
+
+
+def get_kind(code):
+    return code & KIND_MASK
+
+
+def get_timer(code):
+    return code >> TIMER_SHIFT & TIMER_MASK
+
+
+def get_color_index(code):
+    return code >> COLOR_SHIFT
+
+
+def with_kind(code, kind):
+    return code & ~KIND_MASK | kind
+
+
+def with_timer(code, timer):
+    return code & ~(TIMER_MASK << TIMER_SHIFT) | timer << TIMER_SHIFT
+
+
+class Palette:
+    """
+    Two-way mapping between color names and cell color indexes
+    """
+
+    def __init__(self, colors=()):
+        self._colors = list()
+        self._indexes = dict()
+        for color in colors:
+            self.get_index(color)
+
+    def __len__(self):
+        return len(self._colors)
+
+    def get_index(self, color):
+        """
+        :return: Index of the color, the color is added if it is new
+        """
+        index = self._indexes.get(color)
+        if index is None:
+            if len(self._colors) >= MAX_COLORS:
+                raise ValueError("Palette can't contain more than {} "
+                                 "colors".format(MAX_COLORS))
+            index = len(self._colors)
+            self._colors.append(color)
+            self._indexes[color] = index
+        return index
+
+    def get_color(self, index):
+        return self._colors[index]
+
+    def encode_cell(self, cell):
+        """
+        :return: Code of the cell given in the string form:
+        None, 'rainbow', '*<color>' (eraser), '<timer>:<color>' (time bomb)
+        or '<color>'
+        """
+        if not cell:
+            return EMPTY
+        if cell == 'rainbow':
+            return RAINBOW_CODE
+        if cell.startswith("*"):
+            return encode(ERASER, self.get_index(cell[1:]))
+        if ":" in cell:
+            timer, color = cell.split(":", 1)
+            return encode(TIME_BOMB, self.get_index(color), int(timer))
+        return encode(NORMAL, self.get_index(cell))
+
+    def decode_cell(self, code):
+        """
+        :return: String form of the cell code (see encode_cell)
+        """
+        kind = code & KIND_MASK
+        if kind == EMPTY:
+            return None
+        if kind == RAINBOW:
+            return 'rainbow'
+        color = self._colors[code >> COLOR_SHIFT]
+        if kind == ERASER:
+            return "*" + color
+        if kind == TIME_BOMB:
+            return str(get_timer(code)) + ":" + color
+        return color
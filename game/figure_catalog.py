@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Catalog of one-sided figures stored in binary library files,
+one per figure size:
+    header: b"PTXF", format version (byte), figure size (byte),
+            figures amount (uint32, little endian)
+    figures: figure size bytes per figure, x * 16 + y per point
+"""
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+from copy import copy
+
+from game.figures import Figure
+from game.polyominoes import get_one_sided_polyominoes
+
+MAGIC = b"PTXF"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBBI")
+MAX_FIGURE_SIZE = 15
+
+
+def get_default_directory():
+    """
+    :return: PENTRIX_CATALOG_DIR or ~/.cache/pentrix/figures
+    """
+    return os.environ.get("PENTRIX_CATALOG_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "pentrix", "figures")
+
+
+def encode_library(figure_size, polyominoes):
+    """
+    :return: Library file content for the polyominoes of the size
+    """
+    content = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, figure_size,
+                                    len(polyominoes)))
+    for polyomino in polyominoes:
+        content.extend(x * 16 + y for x, y in polyomino)
+    return bytes(content)
+
+
+class FigureLibrary:
+    """
+    Memory-mapped library file of the figures of one size
+    """
+
+    def __init__(self, path, figure_size):
+        with open(path, "rb") as file:
+            self._buffer = mmap.mmap(file.fileno(), 0,
+                                     access=mmap.ACCESS_READ)
+        try:
+            self._amount = self._read_header(path, figure_size)
+        except ValueError:
+            self._buffer.close()
+            raise
+        self.figure_size = figure_size
+
+    def _read_header(self, path, figure_size):
+        """
+        :return: Amount of the figures in the library
+        """
+        if len(self._buffer) < HEADER.size:
+            raise ValueError("{} is not a figure library".format(path))
+        magic, version, size, amount = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or version != FORMAT_VERSION \
+                or size != figure_size \
+                or len(self._buffer) != HEADER.size + amount * size:
+            raise ValueError("{} is not a figure library of size {}".format(
+                path, figure_size))
+        return amount
+
+    def __len__(self):
+        return self._amount
+
+    def get_points(self, index):
+        """
+        :return: Points of the figure with the index
+        """
+        if not 0 <= index < self._amount:
+            raise IndexError("Figure index out of range")
+        start = HEADER.size + index * self.figure_size
+        return [divmod(point, 16)
+                for point in self._buffer[start:start + self.figure_size]]
+
+    def close(self):
+        self._buffer.close()
+
+
+class MemoryFigureLibrary:
+    """
+    Figure library kept in memory, used when the library file can't
+    be written
+    """
+
+    def __init__(self, figure_size, polyominoes):
+        self.figure_size = figure_size
+        self._polyominoes = [list(polyomino) for polyomino in polyominoes]
+
+    def __len__(self):
+        return len(self._polyominoes)
+
+    def get_points(self, index):
+        if not 0 <= index < len(self._polyominoes):
+            raise IndexError("Figure index out of range")
+        return list(self._polyominoes[index])
+
+    def close(self):
+        pass
+
+
+class FigureCatalog:
+    """
+    Builds figure libraries on the first request, stores them in the
+    directory and loads them from there afterwards. If the directory
+    can't be written, the libraries are kept in memory
+    """
+
+    def __init__(self, directory=None):
+        self._directory = directory
+        self._libraries = dict()
+        self._figures = dict()
+
+    @property
+    def directory(self):
+        """
+        :return: The catalog directory, get_default_directory() at the
+        moment of the call if it wasn't specified
+        """
+        return self._directory or get_default_directory()
+
+    def get_path(self, figure_size):
+        return os.path.join(self.directory,
+                            "figures_{}.bin".format(figure_size))
+
+    @staticmethod
+    def check_figure_size(figure_size):
+        if not isinstance(figure_size, int) \
+                or not 1 <= figure_size <= MAX_FIGURE_SIZE:
+            raise ValueError("Only size 1-{} are available".format(
+                MAX_FIGURE_SIZE))
+
+    def get_library(self, figure_size):
+        self.check_figure_size(figure_size)
+        library = self._libraries.get(figure_size)
+        if library is None:
+            try:
+                library = FigureLibrary(self.get_path(figure_size),
+                                        figure_size)
+            except (OSError, ValueError):
+                polyominoes = get_one_sided_polyominoes(figure_size)
+                try:
+                    self.build(figure_size, polyominoes)
+                    library = FigureLibrary(self.get_path(figure_size),
+                                            figure_size)
+                except (OSError, ValueError):
+                    library = MemoryFigureLibrary(figure_size, polyominoes)
+            self._libraries[figure_size] = library
+        return library
+
+    def build(self, figure_size, polyominoes=None):
+        """
+        Generates the library file of the size
+        :param polyominoes: Already generated one-sided polyominoes
+        of the size
+        """
+        if polyominoes is None:
+            polyominoes = get_one_sided_polyominoes(figure_size)
+        content = encode_library(figure_size, polyominoes)
+        directory = self.directory
+        os.makedirs(directory, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(content)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, self.get_path(figure_size))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def get_figures(self, figure_size):
+        """
+        :return: List of all one-sided figures of the size, figures share
+        rotation tables with the cached ones but not the rotation index
+        """
+        self.check_figure_size(figure_size)
+        figures = self._figures.get(figure_size)
+        if figures is None:
+            library = self.get_library(figure_size)
+            figures = [Figure(set(library.get_points(index)))
+                       for index in range(len(library))]
+            self._figures[figure_size] = figures
+        return [copy(figure) for figure in figures]
+
+    def close(self):
+        for library in self._libraries.values():
+            library.close()
+        self._libraries.clear()
+
+
+def main():
+    parse = argparse.ArgumentParser(
+        description="Build figure libraries of the catalog")
+    parse.add_argument("sizes", type=int, nargs='+',
+                       help="Sizes of figures to build libraries for")
+    parse.add_argument("-d", "--directory", type=str, default=None,
+                       help="Catalog directory (default: {})".format(
+                           get_default_directory()))
+    parsed_args = parse.parse_args()
+    catalog = FigureCatalog(parsed_args.directory)
+    for size in parsed_args.sizes:
+        catalog.build(size)
+        print("{}: {} figures".format(size, len(catalog.get_library(size))))
+
+
+if __name__ == '__main__':
+    main()
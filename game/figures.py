@@ -1,5 +1,7 @@
 import sys
 
+from game.polyominoes import get_one_sided_polyominoes
+
 
 def get_clockwise_rotated_figure(figure):
     """
@@ -63,11 +65,8 @@ def generate_figures_cleared(squares_amount):
     """
         Generates a list of figures of the same size without collisions
     """
-    figures = list()
-    for figure in generate_figures(squares_amount):
-        if figure not in figures:
-            figures.append(figure)
-    return figures
+    return [Figure(set(polyomino))
+            for polyomino in get_one_sided_polyominoes(squares_amount)]
 
 
 def get_neighbours(x, y, blacklist_points=[]):
@@ -80,10 +79,56 @@ def get_neighbours(x, y, blacklist_points=[]):
     return neighbours
 
 
+def get_size(figure):
+    """
+    :return: Width and height of the normalized figure
+    """
+    return (max(x for x, y in figure) + 1,
+            max(y for x, y in figure) + 1)
+
+
+def get_bottom_cells(figure):
+    """
+    Points of the normalized figure without a figure point right below
+    them, the figure lands on one of them
+    :return: Sorted tuple of (x, y, gap), gap is the amount of empty
+    lines between the point and the next figure point below it, 0 for
+    the lowest point of the column
+    """
+    bottom_cells = list()
+    for x, y in figure:
+        if (x, y + 1) in figure:
+            continue
+        below = [point_y for point_x, point_y in figure
+                 if point_x == x and point_y > y]
+        bottom_cells.append((x, y, min(below) - y - 1 if below else 0))
+    return tuple(sorted(bottom_cells))
+
+
+def get_row_masks(figure):
+    """
+    :return: Bitmask of the normalized figure points for every row,
+    bit x is set if the row contains (x, y)
+    """
+    width, height = get_size(figure)
+    masks = [0] * height
+    for x, y in figure:
+        masks[y] |= 1 << x
+    return tuple(masks)
+
+
 class Figure:
     def __init__(self, points):
         self.rotations = get_rotations(get_normalized_figure(points))
         self.rotation_index = 0
+        self.rotation_points = tuple(tuple(sorted(rotation))
+                                     for rotation in self.rotations)
+        self.rotation_sizes = tuple(get_size(rotation)
+                                    for rotation in self.rotations)
+        self.rotation_bottoms = tuple(get_bottom_cells(rotation)
+                                      for rotation in self.rotations)
+        self.rotation_row_masks = tuple(get_row_masks(rotation)
+                                        for rotation in self.rotations)
 
     def get_points(self):
         """
@@ -91,6 +136,15 @@ class Figure:
         """
         return self.rotations[self.rotation_index]
 
+    def get_size(self):
+        """
+        :return: Width and height of the current rotation
+        """
+        return self.rotation_sizes[self.rotation_index]
+
+    def get_next_rotation_index(self):
+        return (self.rotation_index + 1) % len(self.rotations)
+
     def get_points_moved(self, x, y):
         """
         :return: Points of figure moved on (x,y) position
@@ -102,25 +156,22 @@ class Figure:
         :return: Points of figure moved on (x,y) position 
         and rotated on 90 degrees
         """
-        rotation_index = (self.rotation_index + 1) % len(self.rotations)
-        return self._get_rotation_points_dx_dy(rotation_index, dx, dy)
+        return self._get_rotation_points_dx_dy(
+            self.get_next_rotation_index(), dx, dy)
 
     def _get_rotation_points_dx_dy(self, rotation_index, dx, dy):
         """
         :return: Points of figure moved on (x,y) position 
         on specified rotation
         """
-        points = self.rotations[rotation_index]
-        moved_points = set()
-        for point in points:
-            moved_points.add((point[0] + dx, point[1] + dy))
-        return moved_points
+        return {(x + dx, y + dy)
+                for x, y in self.rotation_points[rotation_index]}
 
     def rotate(self):
         """
         Moves rotation index
         """
-        self.rotation_index = (self.rotation_index + 1) % len(self.rotations)
+        self.rotation_index = self.get_next_rotation_index()
 
     def __eq__(self, other):
         if not isinstance(other, Figure):
@@ -133,5 +184,8 @@ class Figure:
     def __ne__(self, other):
         return not self == other
 
+    def __hash__(self):
+        return hash(min(self.rotation_points))
+
     def __repr__(self):
         return "Figure({})".format(self.rotations[0])
@@ -1,118 +1,16 @@
-from game.figures import Figure
+from game.figure_catalog import FigureCatalog
+
+MAX_AVAILABLE_FIGURE_SIZE = 10
+
+_catalog = FigureCatalog()
 
 
 def get_available_figure_sizes():
-    return [1, 2, 3, 4, 5, 6]
+    return list(range(1, MAX_AVAILABLE_FIGURE_SIZE + 1))
 
 
 def get_figures(figure_size):
-    if figure_size == 1:
-        return [Figure({(0, 0)})]
-        # 1: 1 => 1
-    if figure_size == 2:
-        return [Figure({(1, 0), (0, 0)})]
-        # 2: 4 => 1
-    if figure_size == 3:
-        return [
-            Figure({(0, 1), (1, 0), (1, 1)}),
-            Figure({(2, 0), (1, 0), (0, 0)})
-            # 3: 24 => 2
-        ]
-    if figure_size == 4:
-        return [
-            Figure({(1, 2), (1, 0), (0, 1), (1, 1)}),
-            Figure({(0, 1), (2, 0), (1, 1), (2, 1)}),
-            Figure({(0, 1), (1, 0), (0, 0), (1, 1)}),
-            Figure({(0, 1), (1, 0), (1, 1), (0, 2)}),
-            Figure({(1, 2), (0, 2), (1, 0), (1, 1)}),
-            Figure({(0, 1), (2, 0), (1, 0), (1, 1)}),
-            Figure({(3, 0), (2, 0), (1, 0), (0, 0)})
-            # 4: 192 => 7
-        ]
-    if figure_size == 5:
-        return [
-            Figure({(1, 2), (0, 1), (2, 1), (1, 0), (1, 1)}),
-            Figure({(0, 1), (2, 1), (2, 0), (2, 2), (1, 1)}),
-            Figure({(1, 2), (0, 1), (0, 0), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (0, 2), (1, 0), (1, 1)}),
-            Figure({(1, 2), (1, 3), (1, 1), (1, 0), (0, 2)}),
-            Figure({(1, 2), (0, 1), (2, 0), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (1, 3), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (2, 2), (1, 0), (1, 1)}),
-            Figure({(1, 2), (2, 1), (2, 0), (2, 2), (0, 2)}),
-            Figure({(0, 1), (3, 0), (2, 1), (2, 0), (1, 1)}),
-            Figure({(0, 1), (3, 0), (3, 1), (2, 1), (1, 1)}),
-            Figure({(0, 1), (0, 0), (2, 1), (2, 0), (1, 1)}),
-            Figure({(0, 1), (0, 2), (2, 1), (2, 0), (1, 1)}),
-            Figure({(1, 2), (0, 2), (1, 0), (1, 1), (0, 3)}),
-            Figure({(0, 1), (0, 2), (2, 0), (1, 0), (1, 1)}),
-            Figure({(1, 2), (1, 3), (1, 0), (1, 1), (0, 3)}),
-            Figure({(1, 2), (0, 2), (2, 0), (1, 0), (1, 1)}),
-            Figure({(0, 0), (3, 0), (2, 0), (1, 0), (4, 0)})
-            # 5: 1856 => 18
-        ]
-    if figure_size == 6:
-        return [
-            Figure({(0, 1), (3, 1), (2, 1), (2, 0), (2, 2), (1, 1)}),
-            Figure({(1, 2), (0, 1), (0, 0), (2, 1), (1, 0), (1, 1)}),
-            Figure({(0, 1), (2, 1), (2, 0), (2, 2), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (2, 1), (2, 0), (2, 2), (1, 1)}),
-            Figure({(1, 2), (2, 1), (2, 0), (2, 3), (2, 2), (0, 2)}),
-            Figure({(0, 1), (3, 0), (2, 1), (2, 0), (2, 2), (1, 1)}),
-            Figure({(0, 1), (2, 1), (2, 0), (2, 3), (2, 2), (1, 1)}),
-            Figure({(0, 1), (3, 2), (2, 1), (2, 0), (2, 2), (1, 1)}),
-            Figure({(0, 1), (3, 2), (3, 0), (3, 1), (2, 1), (1, 1)}),
-            Figure({(0, 1), (0, 0), (2, 1), (2, 0), (2, 2), (1, 1)}),
-            Figure({(0, 1), (0, 2), (2, 1), (2, 0), (2, 2), (1, 1)}),
-            Figure({(1, 2), (0, 1), (0, 0), (0, 2), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (1, 3), (1, 1), (1, 0), (0, 2)}),
-            Figure({(1, 2), (0, 1), (0, 0), (1, 3), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (0, 0), (2, 2), (1, 0), (1, 1)}),
-            Figure({(0, 0), (2, 1), (2, 0), (2, 2), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (1, 3), (0, 0), (1, 1), (0, 2)}),
-            Figure({(1, 2), (1, 3), (1, 1), (1, 0), (0, 2), (0, 3)}),
-            Figure({(1, 2), (0, 1), (0, 2), (2, 0), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (0, 2), (1, 0), (0, 3), (1, 1)}),
-            Figure({(1, 2), (1, 3), (2, 1), (1, 1), (1, 0), (0, 2)}),
-            Figure({(1, 2), (1, 3), (1, 4), (1, 1), (1, 0), (0, 2)}),
-            Figure({(1, 2), (1, 3), (1, 1), (2, 3), (1, 0), (0, 2)}),
-            Figure({(1, 2), (1, 3), (0, 0), (1, 1), (1, 0), (0, 2)}),
-            Figure({(1, 2), (1, 3), (1, 0), (1, 4), (0, 3), (1, 1)}),
-            Figure({(1, 2), (1, 3), (2, 0), (1, 1), (1, 0), (0, 2)}),
-            Figure({(1, 2), (0, 1), (1, 3), (2, 0), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (2, 0), (2, 2), (1, 0), (1, 1)}),
-            Figure({(1, 2), (1, 3), (2, 1), (2, 0), (1, 1), (0, 2)}),
-            Figure({(1, 2), (0, 1), (3, 0), (2, 0), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (1, 3), (2, 2), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (1, 3), (1, 0), (1, 1), (0, 3)}),
-            Figure({(1, 2), (0, 1), (1, 3), (1, 4), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (1, 3), (2, 3), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (2, 3), (2, 2), (1, 0), (1, 1)}),
-            Figure({(1, 2), (0, 1), (3, 2), (2, 2), (1, 0), (1, 1)}),
-            Figure({(1, 2), (3, 2), (3, 0), (3, 1), (2, 2), (0, 2)}),
-            Figure({(1, 2), (0, 1), (2, 1), (2, 0), (2, 2), (0, 2)}),
-            Figure({(1, 2), (2, 1), (2, 0), (2, 2), (0, 3), (0, 2)}),
-            Figure({(1, 2), (2, 1), (2, 0), (2, 2), (1, 0), (0, 2)}),
-            Figure({(1, 3), (2, 1), (2, 0), (2, 3), (2, 2), (0, 3)}),
-            Figure({(1, 2), (3, 0), (2, 1), (2, 0), (2, 2), (0, 2)}),
-            Figure({(0, 1), (3, 0), (3, 1), (2, 1), (1, 1), (4, 0)}),
-            Figure({(0, 1), (0, 0), (3, 0), (2, 1), (2, 0), (1, 1)}),
-            Figure({(0, 1), (3, 0), (0, 2), (2, 1), (2, 0), (1, 1)}),
-            Figure({(1, 2), (3, 0), (3, 1), (2, 1), (2, 2), (0, 2)}),
-            Figure({(0, 1), (3, 0), (2, 1), (2, 0), (1, 1), (4, 0)}),
-            Figure({(0, 1), (3, 1), (2, 1), (4, 1), (1, 1), (4, 0)}),
-            Figure({(0, 1), (0, 0), (3, 0), (3, 1), (2, 1), (1, 1)}),
-            Figure({(0, 1), (3, 0), (3, 1), (2, 1), (1, 1), (0, 2)}),
-            Figure({(0, 0), (3, 0), (3, 1), (2, 1), (1, 0), (1, 1)}),
-            Figure({(1, 2), (1, 3), (2, 1), (2, 0), (2, 2), (0, 3)}),
-            Figure({(1, 2), (0, 2), (1, 0), (0, 4), (0, 3), (1, 1)}),
-            Figure({(1, 2), (1, 3), (1, 0), (0, 4), (0, 3), (1, 1)}),
-            Figure({(1, 2), (0, 2), (2, 0), (1, 0), (1, 1), (0, 3)}),
-            Figure({(1, 2), (3, 0), (0, 2), (2, 1), (2, 0), (1, 1)}),
-            Figure({(1, 2), (0, 2), (2, 1), (2, 0), (0, 3), (1, 1)}),
-            Figure({(1, 2), (1, 3), (1, 4), (0, 4), (1, 0), (1, 1)}),
-            Figure({(1, 2), (1, 3), (1, 0), (2, 0), (0, 3), (1, 1)}),
-            Figure({(0, 0), (3, 0), (2, 0), (5, 0), (1, 0), (4, 0)})
-            # 6: 20864 => 60
-        ]
-    raise ValueError("Only size 1-6 are available")
+    if figure_size not in get_available_figure_sizes():
+        raise ValueError("Only size 1-{} are available".format(
+            MAX_AVAILABLE_FIGURE_SIZE))
+    return _catalog.get_figures(figure_size)
@@ -0,0 +1,89 @@
+from collections import namedtuple
+
+from game.pentrix_game import PentrixGame
+
+LEFT = "left"
+RIGHT = "right"
+ROTATE = "rotate"
+DOWN = "down"
+DROP = "drop"
+
+# Names of the game methods, so the methods are looked up on the game
+# and per-game wrappers (see Instrumentation.instrument) are called
+ACTIONS = {
+    LEFT: "try_move_left",
+    RIGHT: "try_move_right",
+    ROTATE: "try_rotate",
+    DOWN: "try_move_down",
+    DROP: "drop_current_figure"
+}
+
+StepResult = namedtuple("StepResult", ["lines_cleared",
+                                       "score_delta",
+                                       "piece_spawned",
+                                       "game_over"])
+
+
+class HeadlessEngine:
+    """
+    Drives a PentrixGame without a display, one action per step
+    """
+
+    def __init__(self, game=None, gravity=None, **game_kwargs):
+        """
+        :param game: Game to drive, a new PentrixGame(**game_kwargs)
+        is created if not specified
+        :param gravity: If set, the figure is moved down after every
+        `gravity` actions like the GUI game loop does
+        """
+        if game is None:
+            game = PentrixGame(**game_kwargs)
+        if gravity is not None and gravity <= 0:
+            raise ValueError("Gravity must be positive!")
+        self.game = game
+        self.gravity = gravity
+        self.steps = 0
+
+    def step(self, action):
+        """
+        Applies one of ACTIONS to the game
+        :return: StepResult of the action
+        """
+        if action not in ACTIONS:
+            raise ValueError("Unknown action: {}".format(action))
+        game = self.game
+        score = game.score
+        figures_spawned = game.figures_spawned
+        games_lost = game.games_lost
+        lines_cleared = 0
+
+        getattr(game, ACTIONS[action])()
+        if game.figures_spawned != figures_spawned:
+            lines_cleared = game.last_cleared_lines
+        self.steps += 1
+        if self.gravity is not None and self.steps % self.gravity == 0:
+            spawned_before_gravity = game.figures_spawned
+            game.loop()
+            if game.figures_spawned != spawned_before_gravity:
+                lines_cleared += game.last_cleared_lines
+
+        game_over = game.games_lost != games_lost
+        if game_over:
+            score_delta = game.last_game_score - score
+        else:
+            score_delta = game.score - score
+        return StepResult(lines_cleared,
+                          score_delta,
+                          game.figures_spawned != figures_spawned,
+                          game_over)
+
+    def run(self, actions, stop_on_game_over=True):
+        """
+        Applies the actions one by one
+        :return: Generator of StepResult for every applied action
+        """
+        for action in actions:
+            result = self.step(action)
+            yield result
+            if result.game_over and stop_on_game_over:
+                return
@@ -0,0 +1,149 @@
+"""
+Opt-in counters and timing histograms of PentrixGame operations.
+A game created with an Instrumentation counts its operations and times
+its hot methods, a game without one only checks for None
+"""
+import json
+import time
+from collections import Counter
+from functools import wraps
+
+# Bucket i counts durations shorter than 2 ** i microseconds,
+# the last one counts the longer ones too
+BUCKETS_AMOUNT = 24
+
+TIMED_METHODS = ("loop",
+                 "try_move_left",
+                 "try_move_right",
+                 "try_move_down",
+                 "try_rotate",
+                 "drop_current_figure",
+                 "summarize_figure_flight",
+                 "check_for_completed_lines",
+                 "update_time_bombs",
+                 "explode_at")
+
+
+class TimingHistogram:
+    """
+    Durations in power of two microsecond buckets
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * BUCKETS_AMOUNT
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[min(bucket, BUCKETS_AMOUNT - 1)] += 1
+
+    def get_percentile(self, fraction):
+        """
+        :return: Upper bound in seconds of the bucket containing the
+        fraction of the durations, None if there are no durations
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bucket, amount in enumerate(self.buckets):
+            seen += amount
+            if seen >= rank:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def get_snapshot(self):
+        return {"count": self.count,
+                "total": self.total,
+                "mean": self.total / self.count if self.count else None,
+                "min": self.min,
+                "max": self.max,
+                "p50": self.get_percentile(0.5),
+                "p99": self.get_percentile(0.99),
+                "buckets": list(self.buckets)}
+
+
+class Instrumentation:
+    """
+    Operation counters and TimingHistogram of every timed method,
+    times include the nested timed calls. If dump_path is set,
+    a snapshot is appended to it as a JSON line once per dump_interval
+    seconds of timed calls
+    """
+
+    def __init__(self, dump_path=None, dump_interval=60.0,
+                 clock=time.perf_counter):
+        if dump_interval <= 0:
+            raise ValueError("Dump interval must be positive!")
+        self.counters = Counter()
+        self.timings = dict()
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self._clock = clock
+        self._next_dump_time = clock() + dump_interval
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def add_timing(self, name, seconds):
+        histogram = self.timings.get(name)
+        if histogram is None:
+            histogram = self.timings[name] = TimingHistogram()
+        histogram.add(seconds)
+
+    def wrap(self, name, method):
+        """
+        :return: Method recording its durations under the name
+        """
+        clock = self._clock
+
+        @wraps(method)
+        def timed_method(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                end = clock()
+                self.add_timing(name, end - start)
+                if self.dump_path and end >= self._next_dump_time:
+                    self._next_dump_time = end + self.dump_interval
+                    self.dump()
+
+        return timed_method
+
+    def instrument(self, game):
+        """
+        Replaces the timed methods of the game with timed ones
+        """
+        for name in TIMED_METHODS:
+            setattr(game, name, self.wrap(name, getattr(game, name)))
+
+    def get_snapshot(self):
+        """
+        :return: JSON-ready dict of the counters and the timings
+        """
+        return {"time": time.time(),
+                "counters": dict(self.counters),
+                "timings": {name: histogram.get_snapshot()
+                            for name, histogram
+                            in sorted(self.timings.items())}}
+
+    def dump(self, path=None):
+        """
+        Appends a snapshot to the file as a JSON line
+        """
+        with open(path or self.dump_path, "a") as file:
+            file.write(json.dumps(self.get_snapshot()) + "\n")
+
+    def reset(self):
+        self.counters.clear()
+        self.timings.clear()
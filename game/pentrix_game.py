@@ -1,5 +1,12 @@
 import random
-
+from array import array
+from bisect import bisect_left
+from collections import deque, namedtuple
+from collections.abc import MutableMapping
+from functools import wraps
+
+from game import cells, zobrist
+from game.cells import Palette
 from game.figures import Figure
 from game.generated_figures import get_figures
 
@@ -11,16 +18,101 @@ def check_for_positive_integer(value, value_name="Value"):
         raise ValueError(value_name + " must be positive!")
 
 
+class GridCells(MutableMapping):
+    """
+    Dict-like view of ColorGrid cells keyed by (x, y) with cells in the
+    string form (see Palette.encode_cell)
+    """
+
+    def __init__(self, color_grid):
+        self._color_grid = color_grid
+
+    def __getitem__(self, coords):
+        color_grid = self._color_grid
+        return color_grid.palette.decode_cell(
+            color_grid.get_code(coords[0], coords[1]))
+
+    def __setitem__(self, coords, cell):
+        color_grid = self._color_grid
+        color_grid.set_code(coords[0], coords[1],
+                            color_grid.palette.encode_cell(cell))
+
+    def __delitem__(self, coords):
+        if coords not in self:
+            raise KeyError(coords)
+        self[coords] = None
+
+    def __contains__(self, coords):
+        return self._color_grid.is_inside(coords[0], coords[1]) \
+               or coords in self._color_grid.off_field
+
+    def __iter__(self):
+        for x in range(self._color_grid.width):
+            for y in range(self._color_grid.height):
+                yield x, y
+        yield from list(self._color_grid.off_field)
+
+    def __len__(self):
+        return self._color_grid.width * self._color_grid.height + \
+               len(self._color_grid.off_field)
+
+
+BoardFeatures = namedtuple("BoardFeatures", ["column_heights",
+                                             "row_fills",
+                                             "holes",
+                                             "bumpiness",
+                                             "aggregate_height",
+                                             "max_height"])
+
+GridSnapshot = namedtuple("GridSnapshot", ["rows",
+                                           "off_field",
+                                           "row_fills",
+                                           "row_masks",
+                                           "column_fills",
+                                           "bombs",
+                                           "hash"])
+
+
 class ColorGrid:
+    """
+    Grid of cell codes (see game.cells) stored line by line in an array,
+    not empty cells outside of the field are kept in the off_field dict
+    and counted in cells_above_field if they are above the field.
+    Indexes (y * width + x) of time bombs inside the field are kept
+    in the bombs set. If changed_cells is a set, indexes of the field
+    cells which may have changed are added to it.
+    Amounts of not empty cells are kept for every line (row_fills)
+    and column, so board features (see get_features) are only
+    recounted for the columns changed since the last request.
+    Occupancy bitmask of every line (row_masks) is kept too, so line
+    and collision checks are done with integer operations.
+    Zobrist hash of the field cells is kept up to date after the first
+    get_hash call.
+    Snapshots (see get_snapshot) keep the lines as bytes, equal lines
+    of the consecutive snapshots are the same bytes objects
+    """
+
     def __init__(self, width, height):
         check_for_positive_integer(width, "Width")
         check_for_positive_integer(height, "Height")
         self._width = width
         self._height = height
-        self.grid = dict()
-        for x in range(width):
-            for y in range(height):
-                self.grid[(x, y)] = None
+        self.cells = array('H', bytes(2 * width * height))
+        self.off_field = dict()
+        self.cells_above_field = 0
+        self.bombs = set()
+        self.changed_cells = None
+        self.row_fills = [0] * height
+        self.row_masks = [0] * height
+        self._column_fills = [0] * width
+        self._column_heights = [0] * width
+        self._changed_columns = 0
+        self._hash = None
+        self._features = BoardFeatures((0,) * width, (0,) * height, 0, 0, 0,
+                                       0)
+        self.palette = Palette()
+        self.grid = GridCells(self)
+        self._snapshot_rows = (bytes(2 * width),) * height
 
     @property
     def width(self):
@@ -30,51 +122,394 @@ class ColorGrid:
     def height(self):
         return self._height
 
+    def is_inside(self, x, y):
+        return 0 <= x < self._width and 0 <= y < self._height
+
+    def get_code(self, x, y):
+        if 0 <= x < self._width and 0 <= y < self._height:
+            return self.cells[y * self._width + x]
+        return self.off_field.get((x, y), cells.EMPTY)
+
+    def set_code(self, x, y, code):
+        if 0 <= x < self._width and 0 <= y < self._height:
+            index = y * self._width + x
+            old_code = self.cells[index]
+            if old_code & cells.KIND_MASK == cells.TIME_BOMB:
+                self.bombs.discard(index)
+            if code & cells.KIND_MASK == cells.TIME_BOMB:
+                self.bombs.add(index)
+            self.cells[index] = code
+            if (not old_code) != (not code):
+                fill_change = 1 if code else -1
+                self.row_fills[y] += fill_change
+                self.row_masks[y] ^= 1 << x
+                self._column_fills[x] += fill_change
+                self._changed_columns |= 1 << x
+            if self._hash is not None and old_code != code:
+                self._hash ^= zobrist.get_cell_key(index, old_code) ^ \
+                              zobrist.get_cell_key(index, code)
+            if self.changed_cells is not None:
+                self.changed_cells.add(index)
+        else:
+            old_code = self.off_field.pop((x, y), cells.EMPTY)
+            if code:
+                self.off_field[x, y] = code
+            if y < 0:
+                if code and not old_code:
+                    self.cells_above_field += 1
+                elif old_code and not code:
+                    self.cells_above_field -= 1
+
+    def get_bombs(self):
+        """
+        :return: Sorted by x, then by y list of time bombs coordinates
+        """
+        return sorted((index % self._width, index // self._width)
+                      for index in self.bombs)
+
+    def get_line(self, line_number):
+        """
+        :return: Array of the line cell codes
+        """
+        start = line_number * self._width
+        return self.cells[start:start + self._width]
+
     def is_line_full(self, line_number):
-        if not 0 <= line_number < self.height:
+        if not 0 <= line_number < self._height:
             return False
-        for x in range(self.width):
-            if not self.grid[(x, line_number)]:
-                return False
-        return True
+        return self.row_fills[line_number] == self._width
 
     def is_line_full_same_color(self, line_number):
-        if not 0 <= line_number < self.height:
+        if not self.is_line_full(line_number):
             return False
-        color = None
-        for x in range(self.width):
-            cell_color = self.grid[(x, line_number)]
-            if not cell_color:
+        codes = set(self.get_line(line_number))
+        codes.discard(cells.RAINBOW_CODE)
+        return len(codes) <= 1
+
+    def get_full_lines(self):
+        return [y for y in range(self._height) if self.is_line_full(y)]
+
+    def remove_lines(self, line_numbers):
+        """
+        Removes the lines and moves the lines above them down
+        """
+        if not line_numbers:
+            return
+        removed_lines = set(line_numbers)
+        moved_cells_end = min((max(removed_lines) + 1) * self._width,
+                              len(self.cells))
+        if self._hash is not None:
+            self._hash ^= self._get_cells_hash(moved_cells_end)
+        compacted_cells = array('H', bytes(2 * len(removed_lines) *
+                                           self._width))
+        for y in range(self._height):
+            if y not in removed_lines:
+                compacted_cells += self.get_line(y)
+            else:
+                for x, code in enumerate(self.get_line(y)):
+                    if code:
+                        self._column_fills[x] -= 1
+        self.cells = compacted_cells
+        if self._hash is not None:
+            self._hash ^= self._get_cells_hash(moved_cells_end)
+        self.row_fills = [0] * len(removed_lines) + \
+                         [fill for y, fill in enumerate(self.row_fills)
+                          if y not in removed_lines]
+        self.row_masks = [0] * len(removed_lines) + \
+                         [mask for y, mask in enumerate(self.row_masks)
+                          if y not in removed_lines]
+        self._changed_columns = (1 << self._width) - 1
+        if self.changed_cells is not None:
+            self.changed_cells.update(range(moved_cells_end))
+        if self.bombs:
+            self.bombs = self._get_moved_bombs(sorted(removed_lines))
+
+    def get_row_masks(self):
+        """
+        :return: List of occupancy bitmasks of the lines, bit x is set
+        if the cell (x, y) is not empty
+        """
+        return list(self.row_masks)
+
+    def get_hash(self):
+        """
+        :return: Zobrist hash of the cells inside the field
+        """
+        if self._hash is None:
+            self._hash = self._get_cells_hash(len(self.cells))
+        return self._hash
+
+    def _get_cells_hash(self, end):
+        """
+        :return: Zobrist hash of the cells with indexes below the end
+        """
+        cells_hash = 0
+        for index in range(end):
+            code = self.cells[index]
+            if code:
+                cells_hash ^= zobrist.get_cell_key(index, code)
+        return cells_hash
+
+    def get_features(self):
+        """
+        :return: BoardFeatures of the cells inside the field
+        """
+        if self._changed_columns:
+            self._update_column_heights()
+            heights = self._column_heights
+            self._features = BoardFeatures(
+                tuple(heights),
+                tuple(self.row_fills),
+                sum(heights) - sum(self._column_fills),
+                sum(abs(heights[x] - heights[x + 1])
+                    for x in range(self._width - 1)),
+                sum(heights),
+                max(heights))
+        return self._features
+
+    def get_snapshot(self):
+        """
+        :return: Immutable GridSnapshot of the grid
+        """
+        codes = self.cells
+        width = self._width
+        last_rows = self._snapshot_rows
+        rows = list()
+        for y in range(self._height):
+            start = y * width
+            row = codes[start:start + width].tobytes()
+            rows.append(last_rows[y] if row == last_rows[y] else row)
+        self._snapshot_rows = rows = tuple(rows)
+        return GridSnapshot(rows,
+                            tuple(self.off_field.items()),
+                            tuple(self.row_fills),
+                            tuple(self.row_masks),
+                            tuple(self._column_fills),
+                            frozenset(self.bombs),
+                            self._hash)
+
+    def restore(self, snapshot):
+        """
+        Returns the grid to the snapshot made by the grid of the same
+        size
+        """
+        row_size = self.cells.itemsize * self._width
+        if len(snapshot.rows) != self._height \
+                or any(len(row) != row_size for row in snapshot.rows):
+            raise ValueError("Snapshot is made by a grid of another size!")
+        if self.changed_cells is not None:
+            width = self._width
+            for y, row in enumerate(snapshot.rows):
+                start = y * width
+                if self.cells[start:start + width].tobytes() != row:
+                    self.changed_cells.update(range(start, start + width))
+        codes = array('H')
+        codes.frombytes(b"".join(snapshot.rows))
+        self.cells = codes
+        self.off_field = dict(snapshot.off_field)
+        self.cells_above_field = sum(1 for x, y in self.off_field if y < 0)
+        self.row_fills = list(snapshot.row_fills)
+        self.row_masks = list(snapshot.row_masks)
+        self._column_fills = list(snapshot.column_fills)
+        self._changed_columns = (1 << self._width) - 1
+        self.bombs = set(snapshot.bombs)
+        self._hash = snapshot.hash
+        self._snapshot_rows = snapshot.rows
+
+    def _update_column_heights(self):
+        changed_columns = self._changed_columns
+        self._changed_columns = 0
+        x = 0
+        while changed_columns:
+            if changed_columns & 1:
+                height = 0
+                if self._column_fills[x]:
+                    index = x
+                    while not self.cells[index]:
+                        index += self._width
+                    height = self._height - index // self._width
+                self._column_heights[x] = height
+            changed_columns >>= 1
+            x += 1
+
+    def _get_moved_bombs(self, removed_lines):
+        """
+        :return: Bomb indexes after removing of the sorted lines
+        """
+        moved_bombs = set()
+        for index in self.bombs:
+            y = index // self._width
+            lines_below = len(removed_lines) - bisect_left(removed_lines, y)
+            if lines_below and removed_lines[-lines_below] == y:
+                continue
+            moved_bombs.add(index + lines_below * self._width)
+        return moved_bombs
+
+    def fits_masks(self, row_masks, x, y,
+                   own_row_masks=(), own_x=0, own_y=0,
+                   overlap_allowed=False):
+        """
+        :return: True if the figure given by its row masks placed on
+        (x, y) is between the field sides, above its bottom and (unless
+        overlap_allowed) does not overlap cells other than the ones of
+        the figure given by own_row_masks placed on (own_x, own_y)
+        """
+        if x < 0 or y + len(row_masks) > self._height:
+            return False
+        for dy, mask in enumerate(row_masks):
+            mask <<= x
+            if mask >> self._width:
+                return False
+            if overlap_allowed:
+                continue
+            line = y + dy
+            if 0 <= line - own_y < len(own_row_masks):
+                mask &= ~(own_row_masks[line - own_y] << own_x)
+            if mask and self._is_occupied(line, mask):
                 return False
-            if cell_color != 'rainbow':
-                if color is None:
-                    color = cell_color
-                elif color != cell_color:
-                    return False
         return True
 
+    def get_drop_distance(self, bottom_cells, x, y):
+        """
+        :return: Amount of lines the figure with the bottom cells
+        (see figures.get_bottom_cells) placed on (x, y) can fall
+        before it lands
+        """
+        cells_codes = self.cells
+        width = self._width
+        end = len(cells_codes)
+        distance = self._height - y
+        for dx, bottom, gap in bottom_cells:
+            column = x + dx
+            if gap:
+                # Only a cell in the gap under the point can stop it
+                for depth in range(gap):
+                    if self.get_code(column, y + bottom + 1 + depth):
+                        distance = min(distance, depth)
+                        break
+                continue
+            line = y + bottom + 1
+            while line < 0:
+                if (column, line) in self.off_field:
+                    break
+                line += 1
+            else:
+                index = line * width + column
+                while index < end and not cells_codes[index]:
+                    index += width
+                line = index // width
+            distance = min(distance, line - y - bottom - 1)
+        return distance
+
+    def _is_occupied(self, line_number, mask):
+        """
+        :return: True if any cell of the line selected by the mask
+        is not empty
+        """
+        if line_number >= 0:
+            return self.row_masks[line_number] & mask != 0
+        cell_x = 0
+        while mask:
+            if mask & 1 and self.off_field.get((cell_x, line_number)):
+                return True
+            mask >>= 1
+            cell_x += 1
+        return False
+
     def clear(self):
-        for coords in self.grid:
-            self.grid[coords] = None
+        self.cells = array('H', bytes(2 * self._width * self._height))
+        self.bombs.clear()
+        self.row_fills = [0] * self._height
+        self.row_masks = [0] * self._height
+        self._column_fills = [0] * self._width
+        self._changed_columns = (1 << self._width) - 1
+        if self._hash is not None:
+            self._hash = 0
+        if self.changed_cells is not None:
+            self.changed_cells.update(range(len(self.cells)))
+        self.off_field.clear()
+        self.cells_above_field = 0
 
 
 class FiguresList:
-    def __init__(self, figures_types={5}, balance_types=False):
+    def __init__(self, figures_types={5}, balance_types=False,
+                 random_generator=random):
         self._balance_types = balance_types
+        self._random = random_generator
+        self._all_figures = list()
         if balance_types:
             self._figures = list()
             for figure_type in figures_types:
                 self._figures.append(get_figures(figure_type))
+                self._all_figures.extend(self._figures[-1])
         else:
             self._figures = list()
             for figure_type in figures_types:
                 self._figures.extend(get_figures(figure_type))
+            self._all_figures.extend(self._figures)
 
     def get_random_figure(self):
         if self._balance_types:
-            return random.choice(random.choice(self._figures))
+            return self._random.choice(self._random.choice(self._figures))
         else:
-            return random.choice(self._figures)
+            return self._random.choice(self._figures)
+
+    def get_rotation_indexes(self):
+        """
+        :return: Tuple of the current rotation indexes of all the figures
+        """
+        return tuple(figure.rotation_index for figure in self._all_figures)
+
+    def set_rotation_indexes(self, rotation_indexes):
+        for figure, rotation_index in zip(self._all_figures,
+                                          rotation_indexes):
+            figure.rotation_index = rotation_index
+
+
+PreviewFigure = namedtuple("PreviewFigure", ["figure", "code", "x"])
+
+GameSnapshot = namedtuple("GameSnapshot", ["grid",
+                                           "figure",
+                                           "rotation_index",
+                                           "x",
+                                           "y",
+                                           "code",
+                                           "preview",
+                                           "figure_rotations",
+                                           "eraser_strafe_lock",
+                                           "score",
+                                           "figures_spawned",
+                                           "games_lost",
+                                           "last_game_score",
+                                           "last_cleared_lines",
+                                           "random_state"])
+
+ChangeSet = namedtuple("ChangeSet", ["cells",
+                                     "cleared_lines",
+                                     "figure_spawned",
+                                     "new_game"])
+
+
+def emits_changes(method):
+    """
+    Decorated PentrixGame method sends a ChangeSet to the game
+    listeners after it finishes, unless it is called from another
+    decorated method
+    """
+
+    @wraps(method)
+    def new_method(self, *args, **kwargs):
+        if not self._listeners:
+            return method(self, *args, **kwargs)
+        self._operations_depth += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._operations_depth -= 1
+            if not self._operations_depth:
+                self._emit_changes()
+
+    return new_method
 
 
 class PentrixGame:
@@ -86,23 +521,85 @@ class PentrixGame:
                  cell_colors=None,
                  color_lines_enabled=True,
                  eraser_enabled=True,
-                 time_bomb_enabled=True):
+                 time_bomb_enabled=True,
+                 seed=None,
+                 preview_size=0,
+                 instrumentation=None):
+        """
+        :param preview_size: Amount of the next figures known in advance
+        (see get_preview)
+        :param instrumentation: Instrumentation counting and timing
+        the game operations, None disables it
+        """
+        if preview_size < 0:
+            raise ValueError("Preview size can't be negative!")
         if cell_colors is None:
             cell_colors = ["blue", "red", "green", "yellow"]
         self._eraser_enabled = eraser_enabled
         self._color_lines_enabled = color_lines_enabled \
                                     and len(cell_colors) > 1
         self._time_bomb_enabled = time_bomb_enabled
+        self.random = random.Random(seed)
         self.figures = FiguresList(figures_types=figure_types,
-                                   balance_types=balance_types)
+                                   balance_types=balance_types,
+                                   random_generator=self.random)
         self.cell_colors = cell_colors
         self.grid = ColorGrid(grid_width, grid_height)
+        self._cell_color_indexes = [self.grid.palette.get_index(color)
+                                    for color in cell_colors]
         self._max_figure_size = max(figure_types)
         self.score = 0
+        self.figures_spawned = 0
+        self.games_lost = 0
+        self.last_game_score = 0
+        self.last_cleared_lines = 0
         self._eraser_strafe_lock = False
+        self.preview_size = preview_size
+        self._next_figures = deque()
+        self._listeners = list()
+        self._operations_depth = 0
+        self._reset_pending_changes()
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            instrumentation.instrument(self)
         self.start_new_game()
 
+    def subscribe(self, listener):
+        """
+        Listener will be called with a ChangeSet after every
+        game operation
+        """
+        if not self._listeners:
+            self.grid.changed_cells = set()
+            self._reset_pending_changes()
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+        if not self._listeners:
+            self.grid.changed_cells = None
+
+    def _reset_pending_changes(self):
+        self._pending_cleared_lines = list()
+        self._pending_figure_spawned = False
+        self._pending_new_game = False
+
+    def _emit_changes(self):
+        width = self.grid.width
+        change_set = ChangeSet(
+            frozenset((index % width, index // width)
+                      for index in self.grid.changed_cells),
+            tuple(self._pending_cleared_lines),
+            self._pending_figure_spawned,
+            self._pending_new_game)
+        self.grid.changed_cells.clear()
+        self._reset_pending_changes()
+        for listener in list(self._listeners):
+            listener(change_set)
+
+    @emits_changes
     def start_new_game(self):
+        self._pending_new_game = True
         self.score = 0
         self.grid.clear()
         self._get_new_figure()
@@ -112,132 +609,269 @@ class PentrixGame:
     TIME_BOMB_PROBABILITY = 0.05
     TIME_BOMB_TIME = 5
 
-    def _get_new_figure(self):
+    @property
+    def current_figure(self):
+        return self._current_figure
+
+    @property
+    def current_figure_color(self):
+        """
+        :return: Current figure cell in the string form
+        (see Palette.encode_cell)
+        """
+        return self.grid.palette.decode_cell(self.current_figure_code)
+
+    def get_preview(self):
+        """
+        :return: Tuple of PreviewFigure of the next preview_size figures
+        """
+        return tuple(self._next_figures)
+
+    def _generate_figure(self):
         if self._eraser_enabled and \
-                        random.random() <= self.ERASER_PROBABILITY:
-            self._current_figure = Figure({(0, 0)})
-            self.current_figure_color = "*" + random.choice(self.cell_colors)
+                        self.random.random() <= self.ERASER_PROBABILITY:
+            figure = Figure({(0, 0)})
+            code = cells.encode(
+                cells.ERASER, self.random.choice(self._cell_color_indexes))
         elif self._time_bomb_enabled and \
-                        random.random() <= self.TIME_BOMB_PROBABILITY:
-            self._current_figure = Figure({(0, 0)})
-            self.current_figure_color = str(self.TIME_BOMB_TIME) + ":" + \
-                                        random.choice(self.cell_colors)
+                        self.random.random() <= self.TIME_BOMB_PROBABILITY:
+            figure = Figure({(0, 0)})
+            code = cells.encode(
+                cells.TIME_BOMB, self.random.choice(self._cell_color_indexes),
+                self.TIME_BOMB_TIME)
         else:
             if self._color_lines_enabled and \
-                            random.random() <= self.RAINBOW_PROBABILITY:
-                self.current_figure_color = 'rainbow'
+                    self.random.random() <= self.RAINBOW_PROBABILITY:
+                code = cells.RAINBOW_CODE
             else:
-                self.current_figure_color = random.choice(self.cell_colors)
-            self._current_figure = self.figures.get_random_figure()
-        current_figure_width = \
-            max(self._current_figure.get_points(), key=lambda p: p[0])[0] + 1
-        current_figure_height = \
-            max(self._current_figure.get_points(), key=lambda p: p[1])[1] + 1
-
-        self.current_figure_x = random.randint(0,
-                                               self.grid.width -
-                                               current_figure_width)
+                code = cells.encode(
+                    cells.NORMAL,
+                    self.random.choice(self._cell_color_indexes))
+            figure = self.figures.get_random_figure()
+        figure_width, figure_height = figure.get_size()
+        x = self.random.randint(0, self.grid.width - figure_width)
+        return PreviewFigure(figure, code, x)
+
+    def _get_new_figure(self):
+        while len(self._next_figures) <= self.preview_size:
+            self._next_figures.append(self._generate_figure())
+        figure, self.current_figure_code, x = self._next_figures.popleft()
+        self._current_figure = figure
+        current_figure_width, current_figure_height = figure.get_size()
+        # Figures are shared, so the rotation may have changed since
+        # the figure got into the preview
+        self.current_figure_x = min(x, self.grid.width - current_figure_width)
         self.current_figure_y = -current_figure_height
-        for coords in self._current_figure.get_points_moved(
+        for x, y in self._current_figure.get_points_moved(
                 self.current_figure_x, self.current_figure_y):
-            self.grid.grid[coords] = self.current_figure_color
+            self.grid.set_code(x, y, self.current_figure_code)
+        self.figures_spawned += 1
+        self._pending_figure_spawned = True
 
     def _try_move(self, dx, dy):
-        is_eraser = self.current_figure_color.startswith("*")
+        is_eraser = cells.get_kind(self.current_figure_code) == cells.ERASER
         if is_eraser and dx != 0 and self._eraser_strafe_lock:
             return False
-        figure_coords = self._current_figure.get_points_moved(
-            self.current_figure_x, self.current_figure_y)
-        new_figure_coords = self._current_figure.get_points_moved(
-            self.current_figure_x + dx, self.current_figure_y + dy
-        )
-        result = self._try_replace(figure_coords, new_figure_coords,
-                                   is_eraser)
+        rotation_index = self._current_figure.rotation_index
+        result = self._try_replace(rotation_index, dx, dy, is_eraser)
         if result:
             if is_eraser:
                 self._eraser_strafe_lock = dx != 0
             self.current_figure_x += dx
             self.current_figure_y += dy
         elif is_eraser and dy > 0:
-            self.current_figure_color = self.current_figure_color.replace("*",
-                                                                          "")
-            self._try_replace(figure_coords, figure_coords)
+            self.current_figure_code = cells.with_kind(
+                self.current_figure_code, cells.NORMAL)
+            self._try_replace(rotation_index, 0, 0)
+        if self.instrumentation is not None:
+            self.instrumentation.count("moves" if result else "failed_moves")
         return result
 
-    def _try_replace(self, figure_coords,
-                     new_figure_coords,
-                     eraser_mode=False):
-        for coords in new_figure_coords:
-            if not (0 <= coords[0] < self.grid.width
-                    and coords[1] < self.grid.height):
-                return False
-            if not eraser_mode \
-                    and coords not in figure_coords \
-                    and coords in self.grid.grid \
-                    and self.grid.grid[coords]:
-                return False
-        for coords in figure_coords:
-            self.grid.grid[coords] = None
-        for coords in new_figure_coords:
-            self.grid.grid[coords] = self.current_figure_color
+    def _try_replace(self, new_rotation_index, dx, dy, eraser_mode=False):
+        """
+        Moves the current figure on (dx, dy) and turns it to the
+        new rotation if it fits there
+        """
+        figure = self._current_figure
+        x = self.current_figure_x
+        y = self.current_figure_y
+        if not self.grid.fits_masks(
+                figure.rotation_row_masks[new_rotation_index], x + dx, y + dy,
+                figure.rotation_row_masks[figure.rotation_index], x, y,
+                eraser_mode):
+            return False
+        set_code = self.grid.set_code
+        for point_x, point_y in figure.rotation_points[figure.rotation_index]:
+            set_code(point_x + x, point_y + y, cells.EMPTY)
+        x += dx
+        y += dy
+        if eraser_mode and self.instrumentation is not None:
+            get_code = self.grid.get_code
+            self.instrumentation.count("eraser_cells_erased", sum(
+                1 for point_x, point_y in figure.rotation_points[
+                    new_rotation_index]
+                if get_code(point_x + x, point_y + y)))
+        code = self.current_figure_code
+        for point_x, point_y in figure.rotation_points[new_rotation_index]:
+            set_code(point_x + x, point_y + y, code)
         return True
 
+    @emits_changes
     def try_move_left(self):
         return self._try_move(-1, 0)
 
+    @emits_changes
     def try_move_right(self):
         return self._try_move(1, 0)
 
+    @emits_changes
     def try_move_down(self):
         result = self._try_move(0, 1)
         if not result:
             self.summarize_figure_flight()
         return result
 
+    @emits_changes
     def check_for_completed_lines(self):
-        cleared_lines = 0
-        for line_y in range(self.grid.height - 1, -1, -1):
-            while self.grid.is_line_full(line_y):
-                cleared_lines += 1
-                if self._color_lines_enabled and \
-                        self.grid.is_line_full_same_color(line_y):
+        full_lines = self.grid.get_full_lines()
+        if self._listeners:
+            self._pending_cleared_lines.extend(full_lines)
+        if full_lines and self.instrumentation is not None:
+            self.instrumentation.count(
+                "line_clears_{}".format(len(full_lines)))
+        cleared_lines = len(full_lines)
+        if self._color_lines_enabled:
+            for line_y in full_lines:
+                if self.grid.is_line_full_same_color(line_y):
                     cleared_lines += 2
-                for x in range(self.grid.width):
-                    self.grid.grid[(x, line_y)] = None
-                for y in range(line_y, 0, -1):
-                    for x in range(self.grid.width):
-                        self.grid.grid[(x, y)] = self.grid.grid[(x, y - 1)]
-                        self.grid.grid[(x, y - 1)] = None
+        self.grid.remove_lines(full_lines)
         return cleared_lines
 
     def check_for_loss(self):
-        for x, y in self.grid.grid:
-            if y < 0 and self.grid.grid[x, y]:
-                self.start_new_game()
-                return True
+        if self.grid.cells_above_field:
+            self.games_lost += 1
+            self.last_game_score = self.score
+            self.start_new_game()
+            return True
         return False
 
+    @emits_changes
     def loop(self):
         self.try_move_down()
 
+    @emits_changes
     def try_rotate(self):
-        figure_coords = self._current_figure.get_points_moved(
-            self.current_figure_x, self.current_figure_y)
-        rotated_figure_coords = self._current_figure.get_rotated_points_dx_dy(
-            self.current_figure_x, self.current_figure_y
-        )
-        result = self._try_replace(figure_coords, rotated_figure_coords)
+        result = self._try_replace(
+            self._current_figure.get_next_rotation_index(), 0, 0)
         if result:
             self._current_figure.rotate()
+        if self.instrumentation is not None:
+            self.instrumentation.count(
+                "rotations" if result else "failed_rotations")
         return result
 
+    def get_features(self):
+        """
+        :return: BoardFeatures of the field, the current figure is
+        counted while it is inside the field, so right after a new
+        figure appears they describe the settled board only
+        """
+        return self.grid.get_features()
+
+    def get_hash(self):
+        """
+        :return: Zobrist hash of the field and the current figure
+        position
+        """
+        return self.grid.get_hash() ^ zobrist.get_piece_key(
+            self._current_figure, self._current_figure.rotation_index,
+            self.current_figure_x, self.current_figure_y,
+            self.current_figure_code)
+
+    def get_snapshot(self):
+        """
+        :return: Immutable GameSnapshot the game can be returned to
+        by restore, figures keep their rotations between spawns, so the
+        rotations of all of them are saved
+        """
+        figure = self._current_figure
+        return GameSnapshot(self.grid.get_snapshot(),
+                            figure,
+                            figure.rotation_index,
+                            self.current_figure_x,
+                            self.current_figure_y,
+                            self.current_figure_code,
+                            tuple(self._next_figures),
+                            self.figures.get_rotation_indexes(),
+                            self._eraser_strafe_lock,
+                            self.score,
+                            self.figures_spawned,
+                            self.games_lost,
+                            self.last_game_score,
+                            self.last_cleared_lines,
+                            self.random.getstate())
+
+    @emits_changes
+    def restore(self, snapshot):
+        """
+        Returns the game to the snapshot made by a game of the same
+        configuration
+        """
+        self.grid.restore(snapshot.grid)
+        self._current_figure = snapshot.figure
+        self.current_figure_x = snapshot.x
+        self.current_figure_y = snapshot.y
+        self.current_figure_code = snapshot.code
+        self._next_figures = deque(snapshot.preview)
+        self.figures.set_rotation_indexes(snapshot.figure_rotations)
+        snapshot.figure.rotation_index = snapshot.rotation_index
+        self._eraser_strafe_lock = snapshot.eraser_strafe_lock
+        self.score = snapshot.score
+        self.figures_spawned = snapshot.figures_spawned
+        self.games_lost = snapshot.games_lost
+        self.last_game_score = snapshot.last_game_score
+        self.last_cleared_lines = snapshot.last_cleared_lines
+        self.random.setstate(snapshot.random_state)
+        self._pending_figure_spawned = True
+
+    def get_drop_distance(self):
+        """
+        :return: Amount of lines the current figure can fall
+        """
+        figure = self._current_figure
+        return self.grid.get_drop_distance(
+            figure.rotation_bottoms[figure.rotation_index],
+            self.current_figure_x, self.current_figure_y)
+
+    def get_ghost_points(self):
+        """
+        :return: Field points the current figure would take if dropped
+        """
+        y = self.current_figure_y + self.get_drop_distance()
+        return [(point_x, point_y)
+                for point_x, point_y in self._current_figure.get_points_moved(
+                    self.current_figure_x, y)
+                if point_y >= 0]
+
+    @emits_changes
     def drop_current_figure(self):
-        while self.try_move_down():
-            pass
+        if self.instrumentation is not None:
+            self.instrumentation.count("drops")
+        if cells.get_kind(self.current_figure_code) == cells.ERASER:
+            while self.try_move_down():
+                pass
+            return
+        distance = self.get_drop_distance()
+        if distance:
+            self._try_move(0, distance)
+        self.try_move_down()
 
+    @emits_changes
     def summarize_figure_flight(self):
+        self.last_cleared_lines = 0
         if not self.check_for_loss():
-            self.add_score(self.check_for_completed_lines())
+            self.last_cleared_lines = self.check_for_completed_lines()
+            self.add_score(self.last_cleared_lines)
             if self._time_bomb_enabled:
                 self.update_time_bombs()
             self._get_new_figure()
@@ -248,29 +882,36 @@ class PentrixGame:
             score_added = score_added * 2 + 100
         self.score += score_added
 
+    @emits_changes
     def update_time_bombs(self):
-        for x in range(self.grid.width):
-            for y in range(self.grid.height):
-                if self.is_bomb(x, y):
-                    splitted_type = self.grid.grid[x, y].split(":", 1)
-                    time = int(splitted_type[0])
-                    if time <= 1:
-                        self.explode_at(x, y)
-                    else:
-                        self.grid.grid[x, y] = str(time - 1) + ":" + \
-                                               splitted_type[1]
+        for x, y in self.grid.get_bombs():
+            if self.is_bomb(x, y):
+                code = self.grid.get_code(x, y)
+                time = cells.get_timer(code)
+                if time <= 1:
+                    self.explode_at(x, y)
+                else:
+                    self.grid.set_code(x, y, cells.with_timer(code, time - 1))
 
+    @emits_changes
     def explode_at(self, bomb_x, bomb_y):
-        self.grid.grid[bomb_x, bomb_y] = None
-        for x in range(-1, 2):
-            for y in range(-1, 2):
-                if self.is_bomb(bomb_x + x, bomb_y + y):
-                    self.explode_at(bomb_x + x, bomb_y + y)
-                else:
-                    self.grid.grid[bomb_x + x, bomb_y + y] = None
+        """
+        Clears the cells around (bomb_x, bomb_y), time bombs among them
+        explode too
+        """
+        explosions = [(bomb_x, bomb_y)]
+        self.grid.set_code(bomb_x, bomb_y, cells.EMPTY)
+        while explosions:
+            bomb_x, bomb_y = explosions.pop()
+            if self.instrumentation is not None:
+                self.instrumentation.count("explosions")
+            for x in range(bomb_x - 1, bomb_x + 2):
+                for y in range(bomb_y - 1, bomb_y + 2):
+                    if self.is_bomb(x, y):
+                        explosions.append((x, y))
+                    self.grid.set_code(x, y, cells.EMPTY)
 
     def is_bomb(self, x, y):
         if not (0 <= x < self.grid.width and 0 <= y < self.grid.height):
             return False
-        cell_type = self.grid.grid[x, y]
-        return cell_type is not None and ":" in cell_type
+        return cells.get_kind(self.grid.get_code(x, y)) == cells.TIME_BOMB
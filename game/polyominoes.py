@@ -0,0 +1,91 @@
+"""
+Polyominoes enumeration. Polyominoes are represented as sorted tuples
+of (x, y) points
+"""
+
+
+def get_normalized_points(points):
+    """
+    :return: Sorted points "moved" to the left upper corner
+    """
+    min_x = min(x for x, y in points)
+    min_y = min(y for x, y in points)
+    return tuple(sorted((x - min_x, y - min_y) for x, y in points))
+
+
+def get_transformations(points, with_reflections=False):
+    """
+    :return: Normalized rotations of the points (and their reflections)
+    """
+    transformations = list()
+    for i in range(4):
+        points = [(y, -x) for x, y in points]
+        transformations.append(get_normalized_points(points))
+        if with_reflections:
+            transformations.append(
+                get_normalized_points([(-x, y) for x, y in points]))
+    return transformations
+
+
+def get_canonical_form(points, one_sided=True):
+    """
+    :return: The same tuple for all the polyominoes which can be
+    rotated (or, if not one_sided, also reflected) to each other
+    """
+    return min(get_transformations(points, not one_sided))
+
+
+def _get_neighbours(x, y):
+    return (x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)
+
+
+def generate_fixed_polyominoes(size):
+    """
+    Redelmeier's algorithm: yields every fixed (different up to
+    translation) polyomino of the size exactly once
+    """
+    if size < 1:
+        raise ValueError("Size must be positive!")
+    polyomino = list()
+    reached = {(0, 0)}
+
+    def is_allowed(cell):
+        return cell[1] > 0 or cell[1] == 0 and cell[0] >= 0
+
+    def extend(untried):
+        while untried:
+            cell = untried.pop()
+            polyomino.append(cell)
+            if len(polyomino) == size:
+                yield get_normalized_points(polyomino)
+            else:
+                new_neighbours = [neighbour
+                                  for neighbour in _get_neighbours(*cell)
+                                  if is_allowed(neighbour)
+                                  and neighbour not in reached]
+                reached.update(new_neighbours)
+                yield from extend(untried + new_neighbours)
+                reached.difference_update(new_neighbours)
+            polyomino.pop()
+
+    yield from extend([(0, 0)])
+
+
+def get_polyominoes(size, one_sided=True):
+    """
+    :return: Sorted list of canonical forms of all the one-sided
+    (different up to rotation) or free (different up to rotation and
+    reflection) polyominoes of the size
+    """
+    canonical_forms = set()
+    for polyomino in generate_fixed_polyominoes(size):
+        canonical_forms.add(get_canonical_form(polyomino, one_sided))
+    return sorted(canonical_forms)
+
+
+def get_one_sided_polyominoes(size):
+    return get_polyominoes(size, one_sided=True)
+
+
+def get_free_polyominoes(size):
+    return get_polyominoes(size, one_sided=False)
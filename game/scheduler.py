@@ -0,0 +1,90 @@
+import time
+from collections import deque
+
+from game.headless import ACTIONS
+
+TICK_RATE = 60
+# Ticks the figure needs to fall one line on each level
+GRAVITY_LEVELS = (60, 48, 37, 28, 21, 16, 11, 8, 6, 4, 3, 2, 1)
+MAX_CATCH_UP_TICKS = 30
+
+
+class GameScheduler:
+    """
+    Runs a PentrixGame in fixed-length ticks independently of rendering.
+    Inputs are queued and applied at the beginning of the next tick,
+    gravity moves the figure down every gravity_levels[level] ticks
+    """
+
+    def __init__(self, game, level=0, gravity_levels=GRAVITY_LEVELS,
+                 tick_rate=TICK_RATE, clock=time.monotonic):
+        if tick_rate <= 0:
+            raise ValueError("Tick rate must be positive!")
+        if not gravity_levels or min(gravity_levels) <= 0:
+            raise ValueError("Gravity levels must be positive!")
+        self.game = game
+        self.gravity_levels = tuple(gravity_levels)
+        self.tick_duration = 1 / tick_rate
+        self.ticks = 0
+        self._clock = clock
+        self._inputs = deque()
+        self._gravity_ticks = 0
+        self._next_tick_time = clock()
+        self._changed = True
+        self.level = level
+        game.subscribe(self._on_changes)
+
+    @property
+    def level(self):
+        return self._level
+
+    @level.setter
+    def level(self, level):
+        if not 0 <= level < len(self.gravity_levels):
+            raise ValueError("Level must be between 0 and {}!".format(
+                len(self.gravity_levels) - 1))
+        self._level = level
+
+    def queue_input(self, action):
+        """
+        Queues one of headless.ACTIONS until the next tick
+        """
+        if action not in ACTIONS:
+            raise ValueError("Unknown action: {}".format(action))
+        self._inputs.append(action)
+
+    def tick(self):
+        while self._inputs:
+            getattr(self.game, ACTIONS[self._inputs.popleft()])()
+        self._gravity_ticks += 1
+        if self._gravity_ticks >= self.gravity_levels[self._level]:
+            self._gravity_ticks = 0
+            self.game.loop()
+        self.ticks += 1
+
+    def update(self):
+        """
+        Runs all the ticks due by now, if the game is too far behind
+        the clock, the skipped time is dropped
+        :return: True if the game field changed since the last update,
+        so it has to be rendered
+        """
+        now = self._clock()
+        ticks_due = 0
+        while now >= self._next_tick_time:
+            if ticks_due == MAX_CATCH_UP_TICKS:
+                self._next_tick_time = now + self.tick_duration
+                break
+            self.tick()
+            ticks_due += 1
+            self._next_tick_time += self.tick_duration
+        changed = self._changed
+        self._changed = False
+        return changed
+
+    def _on_changes(self, change_set):
+        if change_set.cells or change_set.new_game:
+            self._changed = True
+
+    def close(self):
+        self.game.unsubscribe(self._on_changes)
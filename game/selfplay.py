@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+import argparse
+import importlib
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from game import headless
+from game.headless import HeadlessEngine
+
+GameResult = namedtuple("GameResult", ["seed",
+                                       "score",
+                                       "lines_cleared",
+                                       "figures",
+                                       "steps",
+                                       "finished"])
+
+RANDOM_POLICY_ACTIONS = [headless.LEFT, headless.RIGHT, headless.ROTATE,
+                         headless.DOWN, headless.DROP]
+
+
+def random_policy(game, random_generator):
+    """
+    :return: Uniformly chosen action
+    """
+    return random_generator.choice(RANDOM_POLICY_ACTIONS)
+
+
+# Policies of the ai package by name, imported only when they are
+# created, so the game package doesn't depend on the ai one
+AI_POLICIES = {
+    "placement": ("ai.placements", "PlacementPolicy"),
+    "beam": ("ai.beam_search", "BeamSearchPolicy")
+}
+
+POLICY_NAMES = sorted(["random"] + list(AI_POLICIES))
+
+
+def create_policy(name):
+    """
+    :return: New policy with the name from POLICY_NAMES
+    """
+    if name == "random":
+        return random_policy
+    module_name, class_name = AI_POLICIES[name]
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def derive_seeds(base_seed, games_amount):
+    """
+    :return: Reproducible list of per-game seeds
+    """
+    seeds_generator = random.Random(base_seed)
+    return [seeds_generator.getrandbits(64) for _ in range(games_amount)]
+
+
+def get_policy_seed(seed):
+    """
+    :return: Seed of the policy random generator independent of the
+    game one, None for the None seed
+    """
+    if seed is None:
+        return None
+    return "policy:{}".format(seed)
+
+
+def play_game(seed, game_kwargs=None, max_steps=10000, gravity=4,
+              policy=random_policy):
+    """
+    Plays one headless game until it is lost or max_steps are made.
+    The game is seeded with seed and the policy with a seed derived
+    from it (see get_policy_seed), so the policy choices don't follow
+    the figures sequence and the result depends only on the arguments
+    :return: GameResult of the game
+    """
+    engine = HeadlessEngine(gravity=gravity, seed=seed,
+                            **(game_kwargs or dict()))
+    policy_random = random.Random(get_policy_seed(seed))
+    score = 0
+    lines_cleared = 0
+    figures = 0
+    finished = False
+    while engine.steps < max_steps:
+        result = engine.step(policy(engine.game, policy_random))
+        score += result.score_delta
+        lines_cleared += result.lines_cleared
+        figures += result.piece_spawned
+        if result.game_over:
+            finished = True
+            break
+    return GameResult(seed, score, lines_cleared, figures, engine.steps,
+                      finished)
+
+
+def play_games(seeds, game_kwargs=None, max_steps=10000, gravity=4,
+               policy=random_policy, workers=None, chunk_size=16):
+    """
+    Plays a game for every seed on a process pool.
+    Policy must be picklable (e.g. a module level function)
+    :param workers: Amount of processes, all cores are used if None,
+    games are played in the current process if 1
+    :param chunk_size: Amount of games sent to a worker at once
+    :return: Generator of GameResult in the order of seeds
+    """
+    play = partial(play_game, game_kwargs=game_kwargs, max_steps=max_steps,
+                   gravity=gravity, policy=policy)
+    if workers == 1:
+        yield from map(play, seeds)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(play, seeds, chunksize=chunk_size)
+
+
+def main():
+    parsed_args = parse_args()
+    game_kwargs = dict(grid_width=parsed_args.width,
+                       grid_height=parsed_args.height,
+                       figure_types=set(parsed_args.figure_types),
+                       preview_size=parsed_args.preview)
+    seeds = derive_seeds(parsed_args.seed, parsed_args.games)
+    total_score = 0
+    for result in play_games(seeds,
+                             game_kwargs=game_kwargs,
+                             max_steps=parsed_args.max_steps,
+                             policy=create_policy(parsed_args.policy),
+                             workers=parsed_args.workers,
+                             chunk_size=parsed_args.chunk_size):
+        total_score += result.score
+        print("{0.seed}\t{0.score}\t{0.lines_cleared}\t{0.figures}\t"
+              "{0.steps}".format(result))
+    print("Average score: {}".format(total_score / parsed_args.games))
+
+
+def parse_args():
+    parse = argparse.ArgumentParser(
+        description="Play headless Pentrix games on all cores")
+    parse.add_argument("-n", "--games", type=int, default=100,
+                       help="Amount of games to play")
+    parse.add_argument("-s", "--seed", type=int, default=0,
+                       help="Seed the per-game seeds are derived from")
+    parse.add_argument("-f", "--figure_type", type=int, nargs='+',
+                       dest='figure_types', default=[5],
+                       help="Add figure type by size")
+    parse.add_argument("-w", "-W", "--width", type=int, default=15,
+                       help="Game field grid width")
+    parse.add_argument("-H", "--height", type=int, default=30,
+                       help="Game field grid height")
+    parse.add_argument("--max_steps", type=int, default=10000,
+                       help="Maximal amount of actions in a game")
+    parse.add_argument("-p", "--policy", choices=POLICY_NAMES,
+                       default="random",
+                       help="Random actions, the best placements by the "
+                            "heuristic or the beam search over the preview")
+    parse.add_argument("--preview", type=int, default=0,
+                       help="Amount of the next figures the policy can see")
+    parse.add_argument("-j", "--workers", type=int, default=None,
+                       help="Amount of worker processes (all cores by "
+                            "default)")
+    parse.add_argument("--chunk_size", type=int, default=16,
+                       help="Amount of games sent to a worker at once")
+    return parse.parse_args()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Zobrist hashing of game states: every (cell index, cell code) pair and
+every current figure position has a pseudo-random 64-bit key, the state
+hash is XOR of the keys, so it is updated by XOR on every change
+"""
+from collections import OrderedDict
+
+HASH_MASK = (1 << 64) - 1
+CODE_BITS = 16
+PIECE_SALT = 0x5851F42D4C957F2D
+
+_cell_keys = dict()
+
+
+def mix(value):
+    """
+    :return: splitmix64 scrambling of the value
+    """
+    value = (value + 0x9E3779B97F4A7C15) & HASH_MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & HASH_MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & HASH_MASK
+    return value ^ (value >> 31)
+
+
+def get_cell_key(index, code):
+    """
+    :return: Key of the code in the cell with the index, 0 for
+    empty cells
+    """
+    if not code:
+        return 0
+    cell = index << CODE_BITS | code
+    key = _cell_keys.get(cell)
+    if key is None:
+        key = _cell_keys[cell] = mix(cell)
+    return key
+
+
+def get_piece_key(figure, rotation_index, x, y, code):
+    """
+    :return: Key of the current figure position
+    """
+    return mix(hash((hash(figure), rotation_index, x, y, code)) & HASH_MASK
+               ^ PIECE_SALT)
+
+
+class TranspositionTable:
+    """
+    Bounded mapping of state hashes to search results, the least
+    recently used entries are dropped when it is full
+    """
+
+    def __init__(self, max_size=1 << 16):
+        if max_size <= 0:
+            raise ValueError("Size must be positive!")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, state_hash):
+        return state_hash in self._entries
+
+    def get(self, state_hash, default=None):
+        """
+        :return: Stored value of the hash, it becomes the most recently
+        used one
+        """
+        entries = self._entries
+        if state_hash in entries:
+            entries.move_to_end(state_hash)
+            self.hits += 1
+            return entries[state_hash]
+        self.misses += 1
+        return default
+
+    def put(self, state_hash, value):
+        entries = self._entries
+        entries[state_hash] = value
+        entries.move_to_end(state_hash)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
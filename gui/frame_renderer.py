@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Display-free rendering of the game field into RGB pixel buffers
+(written as PPM or PNG images) or ASCII snapshots
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import zlib
+
+from game import cells
+from game.headless import HeadlessEngine
+from game.selfplay import random_policy
+from gui.sprites import get_sprite_pixels
+
+RGB_FILE_PATH = "/usr/share/X11/rgb.txt"
+BASIC_COLORS = {
+    "black": (0, 0, 0),
+    "white": (255, 255, 255),
+    "red": (255, 0, 0),
+    "green": (0, 128, 0),
+    "blue": (0, 0, 255),
+    "yellow": (255, 255, 0),
+    "orange": (255, 165, 0),
+    "purple": (128, 0, 128),
+    "cyan": (0, 255, 255),
+    "magenta": (255, 0, 255),
+    "gray": (128, 128, 128),
+}
+ASCII_EMPTY = "."
+ASCII_RAINBOW = "%"
+ASCII_ERASER = "*"
+ASCII_COLORS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+LINES_CACHE_SIZE = 4096
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def read_rgb_file(path=RGB_FILE_PATH):
+    """
+    :return: Dict of lowercase X11 color names to (r, g, b),
+    empty if there is no such file
+    """
+    colors = dict()
+    try:
+        with open(path) as file:
+            for line in file:
+                parts = line.split(None, 3)
+                if len(parts) == 4 and not line.startswith("!"):
+                    colors[parts[3].strip().lower()] = tuple(
+                        int(part) for part in parts[:3])
+    except OSError:
+        pass
+    return colors
+
+
+class ColorTable:
+    """
+    Resolves Tk color strings ('#rgb'..'#rrrrggggbbbb' or names)
+    to (r, g, b)
+    """
+
+    def __init__(self, named_colors=None):
+        self._colors = dict(read_rgb_file() if named_colors is None
+                            else named_colors)
+        self._colors.update(BASIC_COLORS)
+
+    def get_rgb(self, color):
+        if color.startswith("#"):
+            digits = len(color) - 1
+            if digits not in (3, 6, 9, 12):
+                raise ValueError("{} is not a color".format(color))
+            component_digits = digits // 3
+            try:
+                components = [int(color[1 + i * component_digits:
+                                         1 + (i + 1) * component_digits], 16)
+                              for i in range(3)]
+            except ValueError:
+                raise ValueError("{} is not a color".format(color))
+            max_value = (1 << 4 * component_digits) - 1
+            return tuple(component * 255 // max_value
+                         for component in components)
+        rgb = self._colors.get(color.lower())
+        if rgb is None:
+            raise ValueError("{} is not a color".format(color))
+        return rgb
+
+
+class FrameRenderer:
+    """
+    Renders the grid cells the same way ResizableGridCanvas does:
+    cell_size pixels per cell and one pixel wide grid lines between them
+    """
+
+    def __init__(self, grid, cell_size=8, line_color="white",
+                 bg_color="black", color_table=None):
+        if cell_size < 1:
+            raise ValueError("Cell size must be positive!")
+        self.grid = grid
+        self.cell_size = cell_size
+        self.width = grid.width * (cell_size + 1) - 1
+        self.height = grid.height * (cell_size + 1) - 1
+        self._color_table = color_table or ColorTable()
+        self._bg_pixel = bytes(self._color_table.get_rgb(bg_color))
+        self._line_pixel = bytes(self._color_table.get_rgb(line_color))
+        self._line_row = self._line_pixel * self.width
+        self._sprites = dict()
+        self._lines = dict()
+
+    def render(self):
+        """
+        :return: RGB bytes of the current field, line by line
+        """
+        rows = list()
+        for y in range(self.grid.height):
+            if y:
+                rows.append(self._line_row)
+            rows.extend(self._get_line_rows(y))
+        return b"".join(rows)
+
+    def _get_line_rows(self, y):
+        line = self.grid.get_line(y)
+        key = line.tobytes()
+        line_rows = self._lines.get(key)
+        if line_rows is None:
+            sprites = [self._get_sprite_rows(code) for code in line]
+            line_rows = [self._line_pixel.join(sprite[i] for sprite in sprites)
+                         for i in range(self.cell_size)]
+            if len(self._lines) >= LINES_CACHE_SIZE:
+                self._lines.clear()
+            self._lines[key] = line_rows
+        return line_rows
+
+    def _get_sprite_rows(self, code):
+        sprite = self._sprites.get(code)
+        if sprite is None:
+            kind = cells.get_kind(code)
+            color = None
+            if kind not in (cells.EMPTY, cells.RAINBOW):
+                color = self.grid.palette.get_color(
+                    cells.get_color_index(code))
+            pixels = get_sprite_pixels(kind, color, cells.get_timer(code),
+                                       self.cell_size)
+            sprite = [b"".join(self._get_pixel(color) for color in row)
+                      for row in pixels]
+            self._sprites[code] = sprite
+        return sprite
+
+    def _get_pixel(self, color):
+        if color is None:
+            return self._bg_pixel
+        return bytes(self._color_table.get_rgb(color))
+
+    def write_ppm(self, stream):
+        """
+        Writes the current field as a binary PPM image, images written
+        one after another to a stream make a valid PPM sequence
+        """
+        stream.write(b"P6\n%d %d\n255\n" % (self.width, self.height))
+        stream.write(self.render())
+
+    def write_png(self, stream, compression_level=6):
+        """
+        Writes the current field as a PNG image
+        """
+        pixels = self.render()
+        stride = self.width * 3
+        raw = b"".join(b"\x00" + pixels[start:start + stride]
+                       for start in range(0, len(pixels), stride))
+        stream.write(PNG_SIGNATURE)
+        _write_png_chunk(stream, b"IHDR", struct.pack(
+            ">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+        _write_png_chunk(stream, b"IDAT", zlib.compress(raw,
+                                                        compression_level))
+        _write_png_chunk(stream, b"IEND", b"")
+
+    def get_ascii(self):
+        """
+        :return: One character per cell: '.' is empty, '%' is rainbow,
+        '*' is eraser, a digit is a time bomb timer, a letter is
+        a normal cell of the palette color
+        """
+        return "\n".join("".join(get_ascii_cell(code)
+                                 for code in self.grid.get_line(y))
+                         for y in range(self.grid.height))
+
+
+def get_ascii_cell(code):
+    kind = cells.get_kind(code)
+    if kind == cells.EMPTY:
+        return ASCII_EMPTY
+    if kind == cells.RAINBOW:
+        return ASCII_RAINBOW
+    if kind == cells.ERASER:
+        return ASCII_ERASER
+    if kind == cells.TIME_BOMB:
+        return str(cells.get_timer(code))
+    return ASCII_COLORS[cells.get_color_index(code) % len(ASCII_COLORS)]
+
+
+def _write_png_chunk(stream, chunk_type, data):
+    stream.write(struct.pack(">I", len(data)))
+    stream.write(chunk_type)
+    stream.write(data)
+    stream.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+
+def main():
+    parsed_args = parse_args()
+    engine = HeadlessEngine(gravity=parsed_args.gravity,
+                            seed=parsed_args.seed,
+                            grid_width=parsed_args.width,
+                            grid_height=parsed_args.height,
+                            eraser_enabled=True,
+                            time_bomb_enabled=True,
+                            color_lines_enabled=True)
+    renderer = FrameRenderer(engine.game.grid, parsed_args.cell_size)
+    policy_random = random.Random(parsed_args.seed)
+    image_format = parsed_args.format
+    to_directory = image_format != "ascii" and parsed_args.output != "-"
+    if to_directory:
+        os.makedirs(parsed_args.output, exist_ok=True)
+    for frame in range(parsed_args.frames):
+        if image_format == "ascii":
+            print(renderer.get_ascii(), end="\n\n")
+        elif not to_directory:
+            write_frame(renderer, sys.stdout.buffer, image_format)
+        else:
+            path = os.path.join(parsed_args.output, "frame_{:05d}.{}".format(
+                frame, image_format))
+            with open(path, "wb") as file:
+                write_frame(renderer, file, image_format)
+        engine.step(random_policy(engine.game, policy_random))
+
+
+def write_frame(renderer, stream, image_format):
+    if image_format == "png":
+        renderer.write_png(stream)
+    else:
+        renderer.write_ppm(stream)
+
+
+def parse_args():
+    parse = argparse.ArgumentParser(
+        description="Render frames of a seeded random headless game")
+    parse.add_argument("-n", "--frames", type=int, default=100,
+                       help="Amount of frames to render")
+    parse.add_argument("-s", "--seed", type=int, default=0,
+                       help="Seed of the game and the random actions")
+    parse.add_argument("--format", choices=["ppm", "png", "ascii"],
+                       default="ppm", help="Frames format")
+    parse.add_argument("-o", "--output", type=str, default="frames",
+                       help="Frames directory, '-' writes the frames to "
+                            "stdout (e.g. for ffmpeg -f image2pipe)")
+    parse.add_argument("-c", "--cell_size", type=int, default=8,
+                       help="Cell size in pixels")
+    parse.add_argument("-w", "-W", "--width", type=int, default=15,
+                       help="Game field grid width")
+    parse.add_argument("-H", "--height", type=int, default=30,
+                       help="Game field grid height")
+    parse.add_argument("-g", "--gravity", type=int, default=4,
+                       help="Figure moves down every <gravity> actions")
+    return parse.parse_args()
+
+
+if __name__ == '__main__':
+    main()
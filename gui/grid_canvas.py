@@ -1,5 +1,11 @@
 # !/usr/bin/env python3
-from tkinter import Canvas
+from array import array
+from tkinter import Canvas, PhotoImage
+
+from game import cells
+from gui.sprites import get_ghost_pixels, get_sprite_pixels
+
+BACKGROUNDS_CACHE_SIZE = 8
 
 
 class ResizableGridCanvas(Canvas):
@@ -14,24 +20,43 @@ class ResizableGridCanvas(Canvas):
         self.grid = grid
         self.line_color = line_color
         self.bg_color = bg_color
+        self._dirty_cells = None
+        self._cell_size = None
+        self._sprites = dict()
+        self._hex_colors = dict()
+        self._backgrounds = dict()
+        self._resize_job = None
+        self._ghost = ((), cells.EMPTY)
         self.update_size()
 
     def on_resize(self, event):
+        """
+        Resizes are applied once per idle cycle, however many
+        <Configure> events come before it
+        """
         self.width = event.width
         self.height = event.height
+        if self._resize_job is None:
+            self._resize_job = self.after_idle(self._apply_resize)
+
+    def _apply_resize(self):
+        self._resize_job = None
         self.update_size()
 
     def update_size(self):
         self._update_cell_size()
         self._update_sides()
-        self.redraw()
+        self.rebuild()
 
     def _update_cell_size(self):
         av_w = self.width - self.grid.width + 1
         av_h = self.height - self.grid.height + 1
         av_cw = av_w // self.grid.width
         av_ch = av_h // self.grid.height
-        self._cell_size = av_ch if av_ch < av_cw else av_cw
+        cell_size = av_ch if av_ch < av_cw else av_cw
+        if cell_size != self._cell_size:
+            self._sprites.clear()
+        self._cell_size = cell_size
 
     def _update_sides(self):
         self._left = (self.width
@@ -47,108 +72,160 @@ class ResizableGridCanvas(Canvas):
                         self._cell_size * self.grid.height +
                         self.grid.height - 1)
 
-    def redraw(self):
+    def rebuild(self):
+        """
+        Recreates all the canvas items for the current size
+        """
         self.delete('all')
-        self._draw_bg(self.bg_color)
-        x = self._left
-        for grid_x in range(self.grid.width):
-            y = self._up
-            for grid_y in range(self.grid.height):
-                if self.grid.grid[(grid_x, grid_y)]:
-                    self.draw_cell(x, y, grid_x, grid_y)
-                y += 1 + self._cell_size
-            x += 1 + self._cell_size
-        self._draw_grid_lines()
-
-    def _draw_grid_lines(self):
-        x = self._left + self._cell_size
-        for i in range(self.grid.width - 1):
-            self.create_line(x, self._up, x, self._bottom,
-                             fill=self.line_color)
-            x += 1 + self._cell_size
-        y = self._up + self._cell_size
-        for i in range(self.grid.height - 1):
-            self.create_line(self._left, y, self._right, y,
-                             fill=self.line_color)
-            y += 1 + self._cell_size
-
-    def draw_cell(self, x, y, grid_x, grid_y):
-        color = self.grid.grid[(grid_x, grid_y)]
-        if color == 'rainbow':
-            self.draw_rainbow_cell(x, y)
-        elif color.startswith("*"):
-            self.draw_eraser(x, y, color[1:])
-        elif ":" in color:
-            splitted_color = color.split(":", 1)
-            self.draw_time_bomb(x, y, splitted_color[1],
-                                int(splitted_color[0]))
+        self.create_image(0, 0, anchor="nw", image=self.get_background())
+        self._cell_items = list()
+        for grid_y in range(self.grid.height):
+            for grid_x in range(self.grid.width):
+                self._cell_items.append(self.create_image(
+                    *self._get_cell_position(grid_x, grid_y),
+                    anchor="nw", state="hidden"))
+        self._drawn_codes = array('H', bytes(2 * len(self._cell_items)))
+        self._dirty_cells = None
+        self._ghost_items = list()
+        self.redraw()
+        self.draw_ghost(*self._ghost)
+
+    def apply_changes(self, change_set):
+        """
+        Game listener: remembers the cells to update on the next redraw,
+        so redraw doesn't have to compare the whole grid
+        """
+        if self._dirty_cells is None:
+            self._dirty_cells = set()
+        width = self.grid.width
+        self._dirty_cells.update(y * width + x for x, y in change_set.cells)
+
+    def redraw(self):
+        """
+        Updates the items of the cells changed since the last redraw
+        """
+        drawn_codes = self._drawn_codes
+        grid_cells = self.grid.cells
+        if self._dirty_cells is None:
+            indexes = range(len(grid_cells))
+        else:
+            indexes = self._dirty_cells
+            self._dirty_cells = set()
+        for index in indexes:
+            code = grid_cells[index]
+            if code != drawn_codes[index]:
+                self._update_cell(index, code)
+
+    def _get_cell_position(self, grid_x, grid_y):
+        return (self._left + grid_x * (1 + self._cell_size),
+                self._up + grid_y * (1 + self._cell_size))
+
+    def _update_cell(self, index, code):
+        self._drawn_codes[index] = code
+        item = self._cell_items[index]
+        if code == cells.EMPTY or self._cell_size < 1:
+            self.itemconfig(item, state="hidden")
+        else:
+            self.itemconfig(item, state="normal",
+                            image=self.get_sprite(code))
+
+    def draw_ghost(self, points, code):
+        """
+        Marks the field points (the current figure landing place) with
+        frames of the figure color, points taken by cells are skipped
+        """
+        self._ghost = (points, code)
+        points = [(x, y) for x, y in points if not self.grid.get_code(x, y)]
+        while len(self._ghost_items) < len(points):
+            self._ghost_items.append(self.create_image(
+                0, 0, anchor="nw", state="hidden"))
+        if points and self._cell_size >= 1:
+            sprite = self._get_ghost_sprite(code)
         else:
-            self.draw_normal_cell(x, y, color)
-
-    def draw_normal_cell(self, x, y, color):
-        self.create_rectangle(x, y,
-                              x + self._cell_size,
-                              y + self._cell_size,
-                              fill=color,
-                              outline="")
-
-    def draw_rainbow_cell(self, x, y):
-        a = self._cell_size / 4
-        self.draw_normal_cell(x, y, 'green')
-        self.create_polygon([x, y, x, y + a * 3, x + a * 3, y],
-                            fill="yellow", outline="")
-        self.create_polygon([x, y, x, y + a * 2, x + a * 2, y],
-                            fill="orange", outline="")
-        self.create_polygon([x, y, x, y + a, x + a, y], fill="red",
-                            outline="")
-        a *= -1
-        x += self._cell_size
-        y += self._cell_size
-        self.create_polygon([x, y, x, y + a * 3, x + a * 3, y],
-                            fill="cyan", outline="")
-        self.create_polygon([x, y, x, y + a * 2, x + a * 2, y],
-                            fill="blue", outline="")
-        self.create_polygon([x, y, x, y + a, x + a, y], fill="purple",
-                            outline="")
-
-    def _draw_bg(self, color="black", alt_color="white"):
-        self.create_rectangle(0, 0, self.width, self.height, fill=alt_color,
-                              outline="")
-        self.create_rectangle(self._left, self._up, self._right, self._bottom,
-                              fill=color,
-                              outline="")
-
-    ERASER_BORDER_WIDTH = 4
-
-    def draw_eraser(self, x, y, color):
-        hw = self.ERASER_BORDER_WIDTH / 2
-        self.create_rectangle(x + hw,
-                              y + hw,
-                              x + self._cell_size - hw,
-                              y + self._cell_size - hw,
-                              outline=color,
-                              width=str(self.ERASER_BORDER_WIDTH))
-
-    def draw_time_bomb(self, x, y, color, time):
-        c_x = x + self._cell_size / 2
-        c_y = y + self._cell_size / 2
-        if time >= 1:
-            self.create_polygon(
-                [c_x, y, c_x, c_y, x, c_y],
-                fill=color,
-                outline="")
-        if time >= 2:
-            self.create_polygon(
-                [c_x, y, c_x, c_y, x + self._cell_size, c_y],
-                fill=color,
-                outline="")
-        if time >= 3:
-            self.create_polygon(
-                [c_x, y + self._cell_size, c_x, c_y, x + self._cell_size, c_y],
-                fill=color,
-                outline="")
-        if time >= 4:
-            self.create_polygon(
-                [c_x, y + self._cell_size, c_x, c_y, x, c_y],
-                fill=color,
-                outline="")
+            points = []
+        for item, point in zip(self._ghost_items, points):
+            self.coords(item, *self._get_cell_position(*point))
+            self.itemconfig(item, state="normal", image=sprite)
+        for item in self._ghost_items[len(points):]:
+            self.itemconfig(item, state="hidden")
+
+    def _get_ghost_sprite(self, code):
+        color = "white"
+        if cells.get_kind(code) != cells.RAINBOW:
+            color = self.grid.palette.get_color(cells.get_color_index(code))
+        key = ("ghost", color, self._cell_size)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = self._create_image(
+                get_ghost_pixels(color, self._cell_size))
+            self._sprites[key] = sprite
+        return sprite
+
+    def get_sprite(self, code):
+        """
+        :return: Cached PhotoImage of the cell with the code
+        """
+        kind = cells.get_kind(code)
+        color = None
+        if kind != cells.RAINBOW:
+            color = self.grid.palette.get_color(cells.get_color_index(code))
+        timer = cells.get_timer(code) if kind == cells.TIME_BOMB else 0
+        key = (kind, color, timer, self._cell_size)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = self._create_image(
+                get_sprite_pixels(kind, color, timer, self._cell_size))
+            self._sprites[key] = sprite
+        return sprite
+
+    def _create_image(self, pixels):
+        image = PhotoImage(master=self, width=self._cell_size,
+                           height=self._cell_size)
+        image.put(" ".join(
+            "{" + " ".join(self._get_hex_color(pixel) for pixel in row)
+            + "}" for row in pixels))
+        return image
+
+    def _get_hex_color(self, color):
+        if color is None:
+            color = self.bg_color
+        hex_color = self._hex_colors.get(color)
+        if hex_color is None:
+            red, green, blue = self.winfo_rgb(color)
+            hex_color = "#{:02x}{:02x}{:02x}".format(red >> 8, green >> 8,
+                                                     blue >> 8)
+            self._hex_colors[color] = hex_color
+        return hex_color
+
+    def get_background(self):
+        """
+        :return: Cached PhotoImage of the background with the grid lines
+        for the current size
+        """
+        key = (self.width, self.height)
+        background = self._backgrounds.get(key)
+        if background is None:
+            background = PhotoImage(master=self, width=max(self.width, 1),
+                                    height=max(self.height, 1))
+            self._fill(background, "white", 0, 0, self.width, self.height)
+            self._fill(background, self.bg_color, self._left, self._up,
+                       self._right, self._bottom)
+            x = self._left + self._cell_size
+            for i in range(self.grid.width - 1):
+                self._fill(background, self.line_color, x, self._up,
+                           x + 1, self._bottom)
+                x += 1 + self._cell_size
+            y = self._up + self._cell_size
+            for i in range(self.grid.height - 1):
+                self._fill(background, self.line_color, self._left, y,
+                           self._right, y + 1)
+                y += 1 + self._cell_size
+            if len(self._backgrounds) >= BACKGROUNDS_CACHE_SIZE:
+                del self._backgrounds[next(iter(self._backgrounds))]
+            self._backgrounds[key] = background
+        return background
+
+    def _fill(self, image, color, x1, y1, x2, y2):
+        x1, y1 = max(x1, 0), max(y1, 0)
+        if x1 < x2 and y1 < y2:
+            image.put(self._get_hex_color(color), to=(x1, y1, x2, y2))
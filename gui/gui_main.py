@@ -1,11 +1,14 @@
 # !/usr/bin/env python3
 import tkinter
-from functools import wraps
 
+from game import headless
+from game.scheduler import GameScheduler
 from gui.grid_canvas import ResizableGridCanvas
 
+FRAME_DURATION_MS = 16
 
-def init_gui(game, bg_color, lines_color):
+
+def init_gui(game, bg_color, lines_color, level=0):
     root = tkinter.Tk()
     root.title('Pentrix')
     root.minsize(200, 200)
@@ -17,69 +20,32 @@ def init_gui(game, bg_color, lines_color):
                                       bg_color=bg_color)
     grid_canvas.pack(expand=tkinter.YES, fill=tkinter.BOTH,
                      side=tkinter.BOTTOM)
-    register_events(root, grid_canvas, game)
-
-    def game_loop():
-        game.loop()
-        grid_canvas.redraw()
-        root.title('Pentrix - Score: '+str(game.score))
-        root.after(1000, game_loop)
-
-    game_loop()
-    root.mainloop()
+    game.subscribe(grid_canvas.apply_changes)
+    scheduler = GameScheduler(game, level=level)
+    register_events(root, scheduler)
 
-
-def register_events(root, grid_canvas, game):
-    def redraw_canvas(f):
-        @wraps(f)
-        def new_f(*args, **kwargs):
-            f(*args, **kwargs)
+    def frame():
+        if scheduler.update():
             grid_canvas.redraw()
+            grid_canvas.draw_ghost(game.get_ghost_points(),
+                                   game.current_figure_code)
+            root.title('Pentrix - Score: ' + str(game.score))
+        root.after(FRAME_DURATION_MS, frame)
 
-        return new_f
-
-    def try_and_redraw_canvas(f):
-        @wraps(f)
-        def new_f(*args, **kwargs):
-            if f(*args, **kwargs):
-                grid_canvas.redraw()
-
-        return new_f
-
-    @try_and_redraw_canvas
-    def on_left_key_pressed(event):
-        return game.try_move_left()
-
-    root.bind("<Left>", on_left_key_pressed)
-    root.bind("<a>", on_left_key_pressed)
-    root.bind("<A>", on_left_key_pressed)
-
-    @try_and_redraw_canvas
-    def on_right_key_pressed(event):
-        return game.try_move_right()
-
-    root.bind("<Right>", on_right_key_pressed)
-    root.bind("<d>", on_right_key_pressed)
-    root.bind("<D>", on_right_key_pressed)
-
-    @try_and_redraw_canvas
-    def on_down_key_pressed(event):
-        return game.try_move_down()
-
-    root.bind("<Down>", on_down_key_pressed)
-    root.bind("<s>", on_down_key_pressed)
-    root.bind("<S>", on_down_key_pressed)
+    frame()
+    root.mainloop()
 
-    @try_and_redraw_canvas
-    def on_rotate_key_pressed(event):
-        return game.try_rotate()
 
-    root.bind("<Up>", on_rotate_key_pressed)
-    root.bind("<w>", on_rotate_key_pressed)
-    root.bind("<W>", on_rotate_key_pressed)
+def register_events(root, scheduler):
+    def bind_action(action, *sequences):
+        def on_key_pressed(event):
+            scheduler.queue_input(action)
 
-    @redraw_canvas
-    def on_drop_key_pressed(event):
-        game.drop_current_figure()
+        for sequence in sequences:
+            root.bind(sequence, on_key_pressed)
 
-    root.bind("<space>", on_drop_key_pressed)
+    bind_action(headless.LEFT, "<Left>", "<a>", "<A>")
+    bind_action(headless.RIGHT, "<Right>", "<d>", "<D>")
+    bind_action(headless.DOWN, "<Down>", "<s>", "<S>")
+    bind_action(headless.ROTATE, "<Up>", "<w>", "<W>")
+    bind_action(headless.DROP, "<space>")
@@ -0,0 +1,73 @@
+"""
+Pixel sprites of the cells: rows of color names, None is a transparent
+pixel
+"""
+from game import cells
+
+RAINBOW_BG_COLOR = "green"
+RAINBOW_UPPER_COLORS = ("red", "orange", "yellow")
+RAINBOW_LOWER_COLORS = ("purple", "blue", "cyan")
+ERASER_BORDER_WIDTH = 4
+GHOST_BORDER_WIDTH = 1
+
+
+def get_sprite_pixels(kind, color, timer, size):
+    """
+    :return: size x size list of pixel rows of the cell
+    """
+    if kind == cells.RAINBOW:
+        get_pixel = _get_rainbow_pixel
+    elif kind == cells.ERASER:
+        get_pixel = _get_eraser_pixel
+    elif kind == cells.TIME_BOMB:
+        get_pixel = _get_time_bomb_pixel
+    elif kind == cells.NORMAL:
+        return [[color] * size for _ in range(size)]
+    else:
+        return [[None] * size for _ in range(size)]
+    return [[get_pixel(x + 0.5, y + 0.5, size, color, timer)
+             for x in range(size)]
+            for y in range(size)]
+
+
+def get_ghost_pixels(color, size):
+    """
+    :return: size x size list of pixel rows of a thin frame marking
+    where the current figure lands
+    """
+    return [[color if min(x, y, size - 1 - x, size - 1 - y)
+             < GHOST_BORDER_WIDTH else None
+             for x in range(size)]
+            for y in range(size)]
+
+
+def _get_rainbow_pixel(x, y, size, color, timer):
+    stripe_width = size / 4
+    upper_stripe = int((x + y) / stripe_width)
+    if upper_stripe < len(RAINBOW_UPPER_COLORS):
+        return RAINBOW_UPPER_COLORS[upper_stripe]
+    lower_stripe = int((2 * size - x - y) / stripe_width)
+    if lower_stripe < len(RAINBOW_LOWER_COLORS):
+        return RAINBOW_LOWER_COLORS[lower_stripe]
+    return RAINBOW_BG_COLOR
+
+
+def _get_eraser_pixel(x, y, size, color, timer):
+    if min(x, y, size - x, size - y) < ERASER_BORDER_WIDTH:
+        return color
+    return None
+
+
+def _get_time_bomb_pixel(x, y, size, color, timer):
+    """
+    Every timer unit fills a triangle of a cell quarter,
+    clockwise from the upper left one
+    """
+    half = size / 2
+    if abs(x - half) + abs(y - half) > half:
+        return None
+    if y < half:
+        quarter = 0 if x < half else 1
+    else:
+        quarter = 3 if x < half else 2
+    return color if quarter < timer else None
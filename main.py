@@ -5,7 +5,9 @@ import sys
 
 import color_checker
 from game.generated_figures import get_available_figure_sizes
+from game.instrumentation import Instrumentation
 from game.pentrix_game import PentrixGame
+from game.scheduler import GRAVITY_LEVELS
 from gui.gui_main import init_gui
 
 
@@ -63,12 +65,18 @@ def main():
                            cell_colors=parsed_args.cells_colors,
                            eraser_enabled=parsed_args.eraser,
                            color_lines_enabled=parsed_args.color_lines,
-                           time_bomb_enabled=parsed_args.time_bomb)
+                           time_bomb_enabled=parsed_args.time_bomb,
+                           instrumentation=Instrumentation(
+                               parsed_args.stats,
+                               parsed_args.stats_interval)
+                           if parsed_args.stats else None)
+        level = parsed_args.level
     else:
         game = PentrixGame()
         lines_color = "white"
         bg_color = "black"
-    init_gui(game, bg_color, lines_color)
+        level = 0
+    init_gui(game, bg_color, lines_color, level)
 
 
 def parse_args():
@@ -103,6 +111,21 @@ def parse_args():
                             "which includes cells of the same color ("
                             "+rainbow). Will be ignored if there's only 1 "
                             "color")
+    parse.add_argument("-l", "--level",
+                       type=int,
+                       default=0,
+                       choices=range(len(GRAVITY_LEVELS)),
+                       metavar="0-{}".format(len(GRAVITY_LEVELS) - 1),
+                       help="Gravity level, the figures fall faster on "
+                            "higher levels")
+    parse.add_argument("--stats",
+                       type=str,
+                       help="JSON lines file the game operation counters "
+                            "and timings are appended to")
+    parse.add_argument("--stats_interval",
+                       type=float,
+                       default=60.0,
+                       help="Seconds between the --stats records")
     parse.add_argument("--cc", "--cells_colors",
                        type=str,
                        dest="cells_colors",
@@ -1,10 +1,42 @@
 # !/usr/bin/env python3
 
+import random
 import unittest
 
+from game import cells
 from game.pentrix_game import ColorGrid, FiguresList, PentrixGame
 
 
+def check_fits_masks(test_case, grid):
+    grid.grid[1, 1] = "red"
+    test_case.assertTrue(grid.fits_masks((0b1, 0b1), 0, 0))
+    test_case.assertFalse(grid.fits_masks((0b11,), 0, 1))
+    test_case.assertTrue(grid.fits_masks((0b11,), 0, 1, (0b1,), 1, 1))
+    test_case.assertTrue(grid.fits_masks((0b11,), 0, 1,
+                                         overlap_allowed=True))
+    test_case.assertFalse(grid.fits_masks((0b1,), grid.width, 1))
+    test_case.assertFalse(grid.fits_masks((0b1,), -1, 1))
+    test_case.assertFalse(grid.fits_masks((0b1,), 0, grid.height))
+    test_case.assertTrue(grid.fits_masks((0b1,), 0, -2))
+
+
+def check_remove_lines(test_case, grid):
+    for y, color in enumerate(["red", "blue", "green", "white", "red"]):
+        grid.grid[y % grid.width, y] = color
+    for y in (2, 4, 5):
+        for x in range(grid.width):
+            grid.grid[x, y] = "black"
+    test_case.assertEqual(grid.get_full_lines(), [2, 4, 5])
+    grid.remove_lines(grid.get_full_lines())
+    test_case.assertEqual(grid.get_full_lines(), [])
+    for y in range(3):
+        for x in range(grid.width):
+            test_case.assertIsNone(grid.grid[x, y])
+    test_case.assertEqual(grid.grid[0, 3], "red")
+    test_case.assertEqual(grid.grid[1, 4], "blue")
+    test_case.assertEqual(grid.grid[3, 5], "white")
+
+
 class TestColorGrid(unittest.TestCase):
     def test_create(self):
         ColorGrid(10, 10)
@@ -20,6 +52,31 @@ class TestColorGrid(unittest.TestCase):
         self.assertEqual(grid.width, 10)
         self.assertEqual(grid.height, 20)
 
+    def test_codes(self):
+        grid = ColorGrid(10, 20)
+        grid.grid[3, 4] = "2:red"
+        code = grid.get_code(3, 4)
+        self.assertEqual(cells.get_kind(code), cells.TIME_BOMB)
+        self.assertEqual(grid.cells[4 * 10 + 3], code)
+        grid.set_code(3, 4, cells.RAINBOW_CODE)
+        self.assertEqual(grid.grid[3, 4], "rainbow")
+        self.assertEqual(len(grid.cells.tobytes()), 2 * 10 * 20)
+
+    def test_off_field(self):
+        grid = ColorGrid(10, 20)
+        grid.grid[3, -1] = "red"
+        grid.grid[3, 20] = "red"
+        self.assertEqual(grid.cells_above_field, 1)
+        grid.grid[3, -1] = "blue"
+        self.assertEqual(grid.cells_above_field, 1)
+        grid.grid[3, -1] = None
+        grid.grid[4, -1] = None
+        del grid.grid[3, 20]
+        self.assertEqual(grid.cells_above_field, 0)
+        self.assertEqual(grid.off_field, dict())
+        self.assertIsNone(grid.grid[3, -1])
+        self.assertRaises(KeyError, grid.grid.__delitem__, (3, -1))
+
     def test_is_line_full(self):
         grid = ColorGrid(10, 20)
         for x in range(10):
@@ -45,6 +102,112 @@ class TestColorGrid(unittest.TestCase):
         grid.grid[5, 5] = "rainbow"
         self.assertTrue(grid.is_line_full_same_color(5))
 
+    def test_fits_masks(self):
+        check_fits_masks(self, ColorGrid(10, 20))
+
+    def test_remove_lines(self):
+        check_remove_lines(self, ColorGrid(4, 6))
+
+    def test_get_features(self):
+        grid = ColorGrid(4, 5)
+        for x, y in ((0, 4), (0, 2), (1, 3), (1, 4), (3, 1)):
+            grid.grid[x, y] = "red"
+        self.assertEqual(grid.get_features(),
+                         ((3, 2, 0, 4), (0, 1, 1, 1, 2), 4, 7, 9, 4))
+        grid.grid[2, 4] = "red"
+        grid.grid[3, 4] = "red"
+        features = grid.get_features()
+        self.assertEqual(features.column_heights, (3, 2, 1, 4))
+        self.assertEqual(features.holes, 3)
+        grid.remove_lines([4])
+        features = grid.get_features()
+        self.assertEqual(features.column_heights, (2, 1, 0, 3))
+        self.assertEqual(features.row_fills, (0, 0, 1, 1, 1))
+        self.assertEqual(features.holes, 3)
+        grid.clear()
+        self.assertEqual(grid.get_features().aggregate_height, 0)
+
+    def test_get_hash(self):
+        grid = ColorGrid(4, 6)
+        other_grid = ColorGrid(4, 6)
+        self.assertEqual(grid.get_hash(), 0)
+        for x, y in ((0, 5), (1, 5), (2, 5), (3, 5), (1, 4), (2, 2)):
+            grid.grid[x, y] = "red"
+        grid.grid[3, 4] = "1:blue"
+        grid.grid[2, 2] = None
+        grid.remove_lines([5])
+        for x, y in ((1, 5), (3, 5)):
+            other_grid.grid[x, y] = "red" if x == 1 else "1:blue"
+        self.assertEqual(grid.get_hash(), other_grid.get_hash())
+        grid.grid[0, 0] = "red"
+        self.assertNotEqual(grid.get_hash(), other_grid.get_hash())
+        grid.clear()
+        self.assertEqual(grid.get_hash(), 0)
+
+    def test_get_drop_distance(self):
+        grid = ColorGrid(4, 6)
+        grid.grid[1, 4] = "red"
+        grid.grid[2, 1] = "red"
+        self.assertEqual(grid.get_drop_distance(
+            ((0, 0, 0), (1, 0, 0)), 0, 0), 3)
+        self.assertEqual(grid.get_drop_distance(
+            ((0, 1, 0), (1, 0, 0)), 2, 2), 2)
+        self.assertEqual(grid.get_drop_distance(((0, 0, 0),), 3, -3), 8)
+        grid.grid[3, -1] = "red"
+        self.assertEqual(grid.get_drop_distance(((0, 0, 0),), 3, -3), 1)
+        # The C figure lands on a field cell in its gap
+        grid = ColorGrid(4, 6)
+        for x, y in ((0, 0), (0, 1), (0, 2), (1, 0), (1, 2)):
+            grid.grid[x, y] = "blue"
+        bottom_cells = ((0, 2, 0), (1, 0, 1), (1, 2, 0))
+        self.assertEqual(grid.get_drop_distance(bottom_cells, 0, 0), 3)
+        grid.grid[1, 1] = "red"
+        self.assertEqual(grid.get_drop_distance(bottom_cells, 0, 0), 0)
+
+    def test_snapshot(self):
+        grid = ColorGrid(4, 6)
+        grid.grid[1, 5] = "red"
+        grid.grid[2, -1] = "red"
+        grid.get_hash()
+        snapshot = grid.get_snapshot()
+        grid.grid[0, 0] = "blue"
+        next_snapshot = grid.get_snapshot()
+        self.assertIs(next_snapshot.rows[5], snapshot.rows[5])
+        self.assertIsNot(next_snapshot.rows[0], snapshot.rows[0])
+        features = grid.get_features()
+        grid.restore(snapshot)
+        self.assertIsNone(grid.grid[0, 0])
+        self.assertEqual(grid.grid[1, 5], "red")
+        self.assertEqual(grid.cells_above_field, 1)
+        self.assertEqual(grid.get_hash(), snapshot.hash)
+        grid.restore(next_snapshot)
+        self.assertEqual(grid.get_features(), features)
+        self.assertRaises(ValueError, ColorGrid(4, 5).restore, snapshot)
+        other_grid = ColorGrid(5, 6)
+        other_grid.grid[0, 0] = "blue"
+        self.assertRaises(ValueError, other_grid.restore, snapshot)
+        self.assertEqual(other_grid.grid[0, 0], "blue")
+        self.assertEqual(other_grid.row_masks[0], 1)
+
+    def test_row_masks(self):
+        grid = ColorGrid(4, 6)
+        grid.grid[3, 4] = "red"
+        grid.grid[0, 5] = "red"
+        grid.grid[1, -1] = "red"
+        self.assertEqual(grid.row_masks, [0, 0, 0, 0, 0b1000, 0b0001])
+        grid.grid[3, 4] = None
+        self.assertEqual(grid.get_row_masks(), [0, 0, 0, 0, 0, 0b0001])
+        self.assertTrue(grid.fits_masks((0b1000,), 0, 4))
+        self.assertFalse(grid.fits_masks((0b11,), 0, -1))
+        grid.grid[2, 2] = "blue"
+        grid.remove_lines([3])
+        self.assertEqual(grid.row_masks, [0, 0, 0, 0b0100, 0, 0b0001])
+        snapshot = grid.get_snapshot()
+        grid.clear()
+        self.assertEqual(grid.row_masks, [0] * 6)
+        grid.restore(snapshot)
+        self.assertEqual(grid.row_masks, [0, 0, 0, 0b0100, 0, 0b0001])
+
     def test_clear(self):
         grid = ColorGrid(10, 20)
         for x in range(10):
@@ -61,6 +224,13 @@ class TestFiguresList(unittest.TestCase):
         FiguresList({1, 2, 3}, False)
         FiguresList({1, 2, 3}, True)
 
+    def test_rand_figure_seeded(self):
+        figures1 = FiguresList({4, 5}, True, random.Random(1))
+        figures2 = FiguresList({4, 5}, True, random.Random(1))
+        for i in range(20):
+            self.assertEqual(figures1.get_random_figure(),
+                             figures2.get_random_figure())
+
     def test_rand_figure(self):
         l1 = FiguresList({1, 2, 3}, False)
         l1.get_random_figure()
@@ -72,6 +242,17 @@ class TestPentrixGame(unittest.TestCase):
     def test_create(self):
         PentrixGame()
 
+    def test_seed(self):
+        game1 = PentrixGame(seed=5)
+        game2 = PentrixGame(seed=5)
+        for i in range(10):
+            self.assertEqual(game1.current_figure_color,
+                             game2.current_figure_color)
+            self.assertEqual(game1.current_figure_x, game2.current_figure_x)
+            self.assertEqual(game1.grid.grid, game2.grid.grid)
+            game1.drop_current_figure()
+            game2.drop_current_figure()
+
     def test_moving(self):
         game = PentrixGame(figure_types={1}, grid_width=10, grid_height=10)
         x = game.current_figure_x
@@ -95,6 +276,26 @@ class TestPentrixGame(unittest.TestCase):
         game.drop_current_figure()
         self.assertEqual(game.score, 700)
 
+    def test_clear_several_lines(self):
+        game = PentrixGame(grid_width=10, grid_height=10)
+        for x in range(10):
+            for y in (5, 7, 8):
+                game.grid.grid[x, y] = "red"
+            game.grid.grid[x, 9] = "blue" if x % 2 else "red"
+        game.grid.grid[0, 6] = "green"
+        self.assertEqual(game.check_for_completed_lines(), 10)
+        self.assertEqual(game.grid.grid[0, 9], "green")
+
+    def test_long_session_off_field(self):
+        game = PentrixGame(grid_width=10, grid_height=10, seed=1)
+        for i in range(300):
+            game.drop_current_figure()
+            self.assertGreater(game.grid.cells_above_field, 0)
+            self.assertEqual(len(game.grid.off_field),
+                             game.grid.cells_above_field)
+            self.assertLessEqual(len(game.grid.off_field), 5)
+        self.assertGreater(game.games_lost, 0)
+
     def test_update_bombs(self):
         game = PentrixGame(grid_width=20, grid_height=20)
         for x in range(4, 7):
@@ -106,6 +307,35 @@ class TestPentrixGame(unittest.TestCase):
             for y in range(4, 7):
                 self.assertTrue(game.grid.grid[x, y] is None)
 
+    def test_update_bombs_timer(self):
+        game = PentrixGame(grid_width=20, grid_height=20)
+        game.grid.grid[5, 5] = "3:red"
+        game.update_time_bombs()
+        self.assertEqual(game.grid.grid[5, 5], "2:red")
+        self.assertEqual(game.grid.get_bombs(), [(5, 5)])
+
+    def test_bombs_index(self):
+        game = PentrixGame(grid_width=10, grid_height=10)
+        game.grid.grid[2, 5] = "3:red"
+        game.grid.grid[3, 8] = "3:red"
+        game.grid.grid[4, 9] = "3:red"
+        for x in range(10):
+            game.grid.grid[x, 7] = "blue"
+            game.grid.grid[x, 9] = game.grid.grid[x, 9] or "blue"
+        game.check_for_completed_lines()
+        self.assertEqual(game.grid.get_bombs(), [(2, 7), (3, 9)])
+        game.grid.grid[2, 7] = None
+        self.assertEqual(game.grid.get_bombs(), [(3, 9)])
+
+    def test_explode_chain(self):
+        game = PentrixGame(grid_width=100, grid_height=100)
+        for x in range(100):
+            for y in range(100):
+                game.grid.grid[x, y] = "5:red"
+        game.explode_at(0, 0)
+        self.assertEqual(game.grid.get_bombs(), [])
+        self.assertFalse(any(game.grid.cells))
+
     def test_explode(self):
         game = PentrixGame(grid_width=20, grid_height=20)
         for x in range(4, 7):
@@ -125,5 +355,159 @@ class TestPentrixGame(unittest.TestCase):
         self.assertTupleEqual((x, y + 1), (game.current_figure_x,
                                            game.current_figure_y))
 
+    def test_drop_distance(self):
+        game = PentrixGame(figure_types={1}, grid_width=10, grid_height=10,
+                           eraser_enabled=False, time_bomb_enabled=False)
+        x = game.current_figure_x
+        game.loop()
+        game.grid.grid[x, 6] = "red"
+        self.assertEqual(game.get_drop_distance(), 5)
+        self.assertEqual(game.get_ghost_points(), [(x, 5)])
+        game.drop_current_figure()
+        self.assertIsNotNone(game.grid.grid[x, 5])
+        self.assertEqual(game.figures_spawned, 2)
+
+    def test_features_long_session(self):
+        game = PentrixGame(grid_width=10, grid_height=12, seed=2,
+                           eraser_enabled=True, time_bomb_enabled=True)
+        for i in range(200):
+            game.drop_current_figure()
+            features = game.get_features()
+            grid = game.grid.grid
+            heights = tuple(
+                next((12 - y for y in range(12) if grid[x, y]), 0)
+                for x in range(10))
+            filled = sum(1 for x in range(10) for y in range(12)
+                         if grid[x, y])
+            self.assertEqual(features.column_heights, heights)
+            self.assertEqual(features.holes, sum(heights) - filled)
+            self.assertEqual(features.row_fills, tuple(
+                sum(1 for x in range(10) if grid[x, y])
+                for y in range(12)))
+
+    def test_hash_long_session(self):
+        game = PentrixGame(grid_width=10, grid_height=12, seed=4)
+        game.get_hash()
+        hashes = set()
+        for i in range(200):
+            game.drop_current_figure()
+            game_hash = game.get_hash()
+            hashes.add(game_hash)
+            grid = ColorGrid(10, 12)
+            grid.cells = game.grid.cells
+            self.assertEqual(game.grid.get_hash(), grid.get_hash())
+            self.assertEqual(game.grid.row_masks, [
+                sum(1 << x for x in range(10) if game.grid.get_code(x, y))
+                for y in range(12)])
+        self.assertGreater(len(hashes), 150)
+
+    def test_preview(self):
+        self.assertRaises(ValueError, PentrixGame, preview_size=-1)
+        game = PentrixGame(grid_width=10, grid_height=20, seed=6,
+                           preview_size=3)
+        other_game = PentrixGame(grid_width=10, grid_height=20, seed=6)
+        for i in range(20):
+            preview = game.get_preview()
+            self.assertEqual(len(preview), 3)
+            self.assertEqual(game.current_figure_code,
+                             other_game.current_figure_code)
+            game.drop_current_figure()
+            other_game.drop_current_figure()
+            self.assertIs(game.current_figure, preview[0].figure)
+            self.assertEqual(game.current_figure_code, preview[0].code)
+
+    def test_change_sets(self):
+        game = PentrixGame(figure_types={1}, grid_width=10, grid_height=10,
+                           seed=3)
+        change_sets = list()
+        game.loop()
+        game.subscribe(change_sets.append)
+        game.loop()
+        self.assertEqual(len(change_sets), 1)
+        x, y = game.current_figure_x, game.current_figure_y
+        self.assertEqual(change_sets[0].cells, {(x, y - 1), (x, y)})
+        self.assertFalse(change_sets[0].figure_spawned)
+        game.drop_current_figure()
+        self.assertEqual(len(change_sets), 2)
+        self.assertTrue(change_sets[1].figure_spawned)
+        self.assertEqual(change_sets[1].cleared_lines, ())
+
+    def test_change_sets_cleared_lines(self):
+        game = PentrixGame(grid_width=10, grid_height=10)
+        change_sets = list()
+        game.subscribe(change_sets.append)
+        for x in range(10):
+            game.grid.grid[x, 9] = "red"
+        game.check_for_completed_lines()
+        self.assertEqual(change_sets[-1].cleared_lines, (9,))
+        self.assertIn((0, 9), change_sets[-1].cells)
+        game.unsubscribe(change_sets.append)
+        game.loop()
+        self.assertEqual(len(change_sets), 1)
+        self.assertIsNone(game.grid.changed_cells)
+
+    def test_snapshot_restore(self):
+        game = PentrixGame(grid_width=10, grid_height=12, seed=5,
+                           preview_size=2)
+        for i in range(30):
+            game.drop_current_figure()
+        game.try_rotate()
+        snapshot = game.get_snapshot()
+
+        def play():
+            states = list()
+            for i in range(30):
+                game.try_move_left()
+                game.drop_current_figure()
+                states.append((game.grid.cells.tobytes(), game.score,
+                               game.get_hash(), game.get_features(),
+                               game.grid.get_row_masks(),
+                               game.games_lost, game.current_figure_code,
+                               game.get_preview()))
+            return states
+
+        states = play()
+        game.restore(snapshot)
+        self.assertEqual(game.get_snapshot(), snapshot)
+        self.assertEqual(play(), states)
+
+    def test_restore_replay(self):
+        actions = (PentrixGame.try_move_left, PentrixGame.try_move_right,
+                   PentrixGame.try_rotate, PentrixGame.loop,
+                   PentrixGame.drop_current_figure)
+        for seed in range(20):
+            game = PentrixGame(grid_width=10, grid_height=12, seed=seed)
+            moves = random.Random(seed).choices(actions, k=200)
+
+            def play():
+                states = list()
+                for move in moves:
+                    move(game)
+                    states.append((game.grid.cells.tobytes(), game.score,
+                                   game.current_figure_x,
+                                   game.current_figure_y,
+                                   game.current_figure.get_points()))
+                return states
+
+            snapshot = game.get_snapshot()
+            states = play()
+            game.restore(snapshot)
+            self.assertEqual(play(), states)
+
+    def test_restore_change_sets(self):
+        game = PentrixGame(figure_types={1}, grid_width=10, grid_height=10,
+                           seed=3)
+        game.loop()
+        snapshot = game.get_snapshot()
+        change_sets = list()
+        game.subscribe(change_sets.append)
+        game.drop_current_figure()
+        game.restore(snapshot)
+        self.assertEqual(len(change_sets), 2)
+        self.assertTrue(change_sets[1].figure_spawned)
+        self.assertIn((game.current_figure_x, game.current_figure_y),
+                      change_sets[1].cells)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from ai.beam_search import BeamSearchPlayer, BeamSearchPolicy, \
+    get_board_hash
+from ai.placements import Placement
+from game.pentrix_game import PentrixGame
+from game.selfplay import play_game
+from game.zobrist import TranspositionTable
+
+
+class TestBeamSearch(unittest.TestCase):
+    def test_create_wrong(self):
+        self.assertRaises(ValueError, BeamSearchPlayer, beam_width=0)
+        self.assertRaises(ValueError, BeamSearchPlayer, {"speed": 1})
+
+    def test_board_hash(self):
+        self.assertEqual(get_board_hash([0, 0]), 0)
+        self.assertNotEqual(get_board_hash([0, 1]), get_board_hash([1, 0]))
+        for row, other_row in ((1 << 70, 1 << 71), (1 | 1 << 64, 1),
+                               (1 << 64, 1), (1 << 128, 1 << 64)):
+            self.assertNotEqual(get_board_hash([0, row]),
+                                get_board_hash([0, other_row]))
+
+    def test_search_wide_board(self):
+        game = PentrixGame(figure_types={1}, grid_width=80, grid_height=4,
+                           eraser_enabled=False, time_bomb_enabled=False,
+                           preview_size=1)
+        for x in range(80):
+            if x != 70:
+                game.grid.grid[x, 3] = "red"
+        player = BeamSearchPlayer(time_budget=10)
+        self.assertEqual(player.search(game), Placement(0, 70, 3))
+
+    def test_search_clears_line(self):
+        game = PentrixGame(figure_types={1}, grid_width=4, grid_height=6,
+                           eraser_enabled=False, time_bomb_enabled=False,
+                           preview_size=2)
+        for x in range(4):
+            if x != 2:
+                game.grid.grid[x, 5] = "red"
+        player = BeamSearchPlayer(time_budget=10)
+        self.assertEqual(player.search(game), Placement(0, 2, 5))
+        self.assertEqual(player.last_stats.depth, 3)
+        self.assertGreater(player.last_stats.positions, 4)
+        self.assertGreater(player.positions_per_second, 0)
+
+    def test_shared_transposition_table(self):
+        game = PentrixGame(grid_width=10, grid_height=20, preview_size=1)
+        table = TranspositionTable()
+        player = BeamSearchPlayer(time_budget=10, transposition_table=table)
+        self.assertIs(player.transposition_table, table)
+        player.search(game)
+        self.assertGreater(len(table), 0)
+        self.assertGreater(table.misses, 0)
+
+    def test_time_budget(self):
+        game = PentrixGame(grid_width=10, grid_height=20, preview_size=3)
+        player = BeamSearchPlayer(time_budget=0)
+        self.assertIsNotNone(player.search(game))
+        self.assertEqual(player.last_stats.depth, 1)
+
+    def test_policy(self):
+        game_kwargs = dict(grid_width=10, grid_height=20, figure_types={4},
+                           eraser_enabled=False, time_bomb_enabled=False,
+                           preview_size=1)
+        result = play_game(1, game_kwargs, max_steps=1000,
+                           policy=BeamSearchPolicy(time_budget=1))
+        self.assertGreater(result.lines_cleared, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+from benchmarks import engine
+from game import cells
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_measure(self):
+        def benchmark(loops, clock):
+            return loops * 0.01
+
+        result = engine.measure(benchmark, repeats=3, min_time=0.05)
+        self.assertEqual(result.loops, 8)
+        self.assertAlmostEqual(result.best, 0.01)
+        self.assertAlmostEqual(result.median, 0.01)
+        self.assertRaises(ValueError, engine.measure, benchmark, repeats=0)
+
+    def test_run_benchmarks(self):
+        def skipped(loops, clock):
+            raise engine.BenchmarkSkipped("no display")
+
+        benchmarks = engine.get_benchmarks(max_figure_size=3)
+        self.assertIn("generate_figures_cleared_3", benchmarks)
+        self.assertNotIn("generate_figures_cleared_4", benchmarks)
+        results = engine.run_benchmarks(
+            {"try_rotate": benchmarks["try_rotate"],
+             "time_bomb_chain": benchmarks["time_bomb_chain"],
+             "skipped": skipped},
+            repeats=1, min_time=0.001)
+        self.assertEqual(list(results["benchmarks"]),
+                         ["try_rotate", "time_bomb_chain"])
+        self.assertGreater(results["benchmarks"]["try_rotate"]["best"], 0)
+        self.assertEqual(results["skipped"], {"skipped": "no display"})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            engine.write_results(results, path)
+            self.assertEqual(engine.read_results(path), results)
+
+    def test_get_color_code(self):
+        game = engine.create_game()
+        palette = game.grid.palette
+        self.assertEqual(palette.decode_cell(engine.get_color_code(game)),
+                         game.cell_colors[0])
+        self.assertEqual(palette.decode_cell(engine.get_color_code(
+            game, cells.TIME_BOMB, 1, 4)), "4:" + game.cell_colors[1])
+
+    def test_compare(self):
+        baseline = {"benchmarks": {"a": {"best": 1.0}, "b": {"best": 1.0}}}
+        results = {"benchmarks": {"a": {"best": 1.05}, "b": {"best": 1.5},
+                                  "c": {"best": 9.0}}}
+        self.assertEqual(engine.compare(results, baseline),
+                         [engine.Regression("b", 1.0, 1.5, 1.5)])
+        self.assertEqual(len(engine.compare(results, baseline, 0.01)), 2)
+        self.assertRaises(ValueError, engine.compare, results, baseline, -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
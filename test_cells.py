@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from game import cells
+from game.cells import Palette
+
+
+class TestCellCodes(unittest.TestCase):
+    def test_encode(self):
+        code = cells.encode(cells.TIME_BOMB, 12, 5)
+        self.assertEqual(cells.get_kind(code), cells.TIME_BOMB)
+        self.assertEqual(cells.get_color_index(code), 12)
+        self.assertEqual(cells.get_timer(code), 5)
+        self.assertLess(code, 1 << 16)
+
+    def test_encode_wrong_timer(self):
+        self.assertRaises(ValueError, cells.encode, cells.TIME_BOMB, 0, 8)
+
+    def test_with(self):
+        code = cells.encode(cells.ERASER, 3)
+        self.assertEqual(cells.with_kind(code, cells.NORMAL),
+                         cells.encode(cells.NORMAL, 3))
+        code = cells.encode(cells.TIME_BOMB, 3, 5)
+        self.assertEqual(cells.with_timer(code, 4),
+                         cells.encode(cells.TIME_BOMB, 3, 4))
+
+
+class TestPalette(unittest.TestCase):
+    def test_indexes(self):
+        palette = Palette(["red", "blue"])
+        self.assertEqual(palette.get_index("blue"), 1)
+        self.assertEqual(palette.get_index("green"), 2)
+        self.assertEqual(palette.get_color(2), "green")
+        self.assertEqual(len(palette), 3)
+
+    def test_too_many_colors(self):
+        palette = Palette(str(i) for i in range(cells.MAX_COLORS))
+        self.assertRaises(ValueError, palette.get_index, "red")
+
+    def test_encode_decode_cell(self):
+        palette = Palette()
+        for cell in [None, "rainbow", "*red", "5:blue", "1:red", "green"]:
+            self.assertEqual(palette.decode_cell(palette.encode_cell(cell)),
+                             cell)
+        self.assertEqual(palette.encode_cell("rainbow"), cells.RAINBOW_CODE)
+        self.assertEqual(palette.encode_cell(None), cells.EMPTY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import mmap
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from game import figure_catalog
+from game.figure_catalog import FigureCatalog
+from game.figures import generate_figures_cleared
+
+
+class TestFigureCatalog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.catalog = FigureCatalog(self.directory.name)
+
+    def tearDown(self):
+        self.catalog.close()
+        self.directory.cleanup()
+
+    def test_build_on_request(self):
+        figures = self.catalog.get_figures(5)
+        self.assertTrue(os.path.exists(self.catalog.get_path(5)))
+        self.assertFalse(os.path.exists(self.catalog.get_path(6)))
+        self.assertEqual(set(figures), set(generate_figures_cleared(5)))
+
+    def test_load(self):
+        self.catalog.build(6)
+        with open(self.catalog.get_path(6), "rb") as file:
+            content = file.read()
+        self.assertEqual(len(content), figure_catalog.HEADER.size + 60 * 6)
+        catalog = FigureCatalog(self.directory.name)
+        self.assertEqual(len(catalog.get_library(6)), 60)
+        self.assertEqual(set(catalog.get_figures(6)),
+                         set(generate_figures_cleared(6)))
+        catalog.close()
+
+    def test_rebuild_broken_library(self):
+        os.makedirs(self.directory.name, exist_ok=True)
+        with open(self.catalog.get_path(4), "wb") as file:
+            file.write(b"PTXF")
+        self.assertEqual(len(self.catalog.get_figures(4)), 7)
+
+    def test_corrupt_library_closed(self):
+        path = self.catalog.get_path(3)
+        os.makedirs(self.directory.name, exist_ok=True)
+        content = figure_catalog.encode_library(3, [[(0, 0)] * 3] * 2)
+        with open(path, "wb") as file:
+            file.write(b"XXXX" + content[4:])
+        buffers = list()
+        real_mmap = mmap.mmap
+
+        def record_mmap(*args, **kwargs):
+            buffers.append(real_mmap(*args, **kwargs))
+            return buffers[-1]
+
+        with mock.patch.object(figure_catalog.mmap, "mmap", record_mmap):
+            self.assertRaises(ValueError, figure_catalog.FigureLibrary,
+                              path, 3)
+            self.assertEqual(len(buffers), 1)
+            self.assertTrue(buffers[0].closed)
+            self.assertEqual(len(self.catalog.get_figures(3)), 2)
+        self.assertFalse(buffers[-1].closed)
+
+    def test_unwritable_directory(self):
+        catalog = FigureCatalog("/dev/null/figures")
+        self.assertEqual(set(catalog.get_figures(4)),
+                         set(generate_figures_cleared(4)))
+        self.assertIsInstance(catalog.get_library(4),
+                              figure_catalog.MemoryFigureLibrary)
+        catalog.close()
+
+    def test_default_directory(self):
+        with mock.patch.dict(os.environ,
+                             {"PENTRIX_CATALOG_DIR": "/dev/null/figures"}):
+            catalog = FigureCatalog()
+            self.assertEqual(catalog.directory, "/dev/null/figures")
+            self.assertEqual(len(catalog.get_figures(3)), 2)
+            catalog.close()
+
+    def test_figures_not_shared(self):
+        figure1 = self.catalog.get_figures(2)[0]
+        figure2 = self.catalog.get_figures(2)[0]
+        figure1.rotate()
+        self.assertEqual(figure2.rotation_index, 0)
+
+    def test_wrong_size(self):
+        self.assertRaises(ValueError, self.catalog.get_figures, 0)
+        self.assertRaises(ValueError, self.catalog.get_figures, 16)
+        self.assertRaises(ValueError, self.catalog.get_figures, [5])
+
+
+if __name__ == "__main__":
+    unittest.main()
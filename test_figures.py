@@ -154,6 +154,12 @@ class TestFigures(unittest.TestCase):
 
         self.assertTrue(is_iterables_equal_no_order(expected, actual))
 
+    def test_generate_figures_cleared_sizes(self):
+        for size, amount in [(1, 1), (4, 7), (6, 60), (7, 196)]:
+            generated = figures.generate_figures_cleared(size)
+            self.assertEqual(len(generated), amount)
+            self.assertEqual(len(set(generated)), amount)
+
     def test_generate_figures_wrong_size(self):
         self.assertRaises(ValueError, game.generated_figures.get_figures,
                           [-10])
@@ -189,6 +195,25 @@ class TestFigureClass(unittest.TestCase):
                                                              "not changed the "
                                                              "figure")
 
+    def test_rotation_tables(self):
+        figure = figures.Figure({(0, 0), (0, 1), (0, 2), (1, 0), (2, 0)})
+        for rotation_index, rotation in enumerate(figure.rotations):
+            self.assertEqual(set(figure.rotation_points[rotation_index]),
+                             rotation)
+        self.assertEqual(figure.rotation_sizes[0], (3, 3))
+        self.assertEqual(figure.rotation_bottoms[0],
+                         ((0, 2, 0), (1, 0, 0), (2, 0, 0)))
+        self.assertEqual(figure.rotation_row_masks[0], (0b111, 0b1, 0b1))
+        self.assertEqual(figures.get_bottom_cells(
+            {(0, 0), (0, 1), (0, 2), (1, 0), (1, 2)}),
+            ((0, 2, 0), (1, 0, 1), (1, 2, 0)))
+
+    def test_size(self):
+        figure = figures.Figure({(0, 0), (1, 0)})
+        self.assertEqual(figure.get_size(), (2, 1))
+        figure.rotate()
+        self.assertEqual(figure.get_size(), (1, 2))
+
     def test_eq(self):
         rotations = [{(0, 0), (1, 0)}, {(0, 0), (0, 1)}]
         figure1 = figures.Figure(rotations[0])
@@ -201,6 +226,15 @@ class TestFigureClass(unittest.TestCase):
         figure2 = figures.Figure({(2, 0), (1, 0), (0, 0)})
         self.assertNotEqual(figure1, figure2)
 
+    def test_hash(self):
+        figure1 = figures.Figure({(0, 0), (1, 0), (2, 0), (2, 1)})
+        figure2 = figures.Figure({(1, 0), (1, 1), (1, 2), (0, 2)})
+        figure3 = figures.Figure({(0, 0), (1, 0), (2, 0), (0, 1)})
+        figure2.rotate()
+        self.assertEqual(figure1, figure2)
+        self.assertEqual(hash(figure1), hash(figure2))
+        self.assertEqual(len({figure1, figure2, figure3}), 2)
+
     def test_repr(self):
         figure1 = figures.Figure({(0, 1), (1, 0), (1, 1)})
         figure2 = figures.Figure({(2, 0), (1, 0), (0, 0)})
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import io
+import struct
+import unittest
+import zlib
+
+from game.pentrix_game import ColorGrid
+from gui.frame_renderer import ColorTable, FrameRenderer
+
+
+class TestColorTable(unittest.TestCase):
+    def test_get_rgb(self):
+        table = ColorTable({"light cyan": (224, 255, 255)})
+        self.assertEqual(table.get_rgb("#f00"), (255, 0, 0))
+        self.assertEqual(table.get_rgb("#00ff80"), (0, 255, 128))
+        self.assertEqual(table.get_rgb("Light Cyan"), (224, 255, 255))
+        self.assertEqual(table.get_rgb("red"), (255, 0, 0))
+        self.assertRaises(ValueError, table.get_rgb, "#12345")
+        self.assertRaises(ValueError, table.get_rgb, "no such color")
+
+
+class TestFrameRenderer(unittest.TestCase):
+    def setUp(self):
+        self.grid = ColorGrid(3, 2)
+        self.grid.grid[0, 0] = "red"
+        self.grid.grid[2, 1] = "3:blue"
+        self.renderer = FrameRenderer(self.grid, cell_size=4,
+                                      color_table=ColorTable(dict()))
+
+    def get_pixel(self, pixels, x, y):
+        start = (y * self.renderer.width + x) * 3
+        return tuple(pixels[start:start + 3])
+
+    def test_render(self):
+        pixels = self.renderer.render()
+        self.assertEqual((self.renderer.width, self.renderer.height), (14, 9))
+        self.assertEqual(len(pixels), 14 * 9 * 3)
+        self.assertEqual(self.get_pixel(pixels, 0, 0), (255, 0, 0))
+        self.assertEqual(self.get_pixel(pixels, 4, 0), (255, 255, 255))
+        self.assertEqual(self.get_pixel(pixels, 5, 0), (0, 0, 0))
+        self.assertEqual(self.get_pixel(pixels, 11, 6), (0, 0, 255))
+        self.grid.grid[0, 0] = None
+        self.assertEqual(self.get_pixel(self.renderer.render(), 0, 0),
+                         (0, 0, 0))
+
+    def test_write_ppm(self):
+        stream = io.BytesIO()
+        self.renderer.write_ppm(stream)
+        self.assertEqual(stream.getvalue(),
+                         b"P6\n14 9\n255\n" + self.renderer.render())
+
+    def test_write_png(self):
+        stream = io.BytesIO()
+        self.renderer.write_png(stream)
+        data = stream.getvalue()
+        self.assertEqual(data[:8], b"\x89PNG\r\n\x1a\n")
+        self.assertEqual(struct.unpack(">II", data[16:24]), (14, 9))
+        idat_length = struct.unpack(">I", data[33:37])[0]
+        raw = zlib.decompress(data[41:41 + idat_length])
+        self.assertEqual(raw[1:1 + 14 * 3], self.renderer.render()[:14 * 3])
+
+    def test_get_ascii(self):
+        self.assertEqual(self.renderer.get_ascii(), "A..\n..3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from game import headless
+from game.headless import HeadlessEngine
+
+
+class TestHeadlessEngine(unittest.TestCase):
+    def test_create_wrong(self):
+        self.assertRaises(ValueError, HeadlessEngine, gravity=0)
+
+    def test_unknown_action(self):
+        engine = HeadlessEngine()
+        self.assertRaises(ValueError, engine.step, "jump")
+
+    def test_move(self):
+        engine = HeadlessEngine(figure_types={1}, grid_width=10,
+                                grid_height=10)
+        y = engine.game.current_figure_y
+        result = engine.step(headless.DOWN)
+        self.assertEqual(result, (0, 0, False, False))
+        self.assertEqual(engine.game.current_figure_y, y + 1)
+
+    def test_drop_clears_line(self):
+        engine = HeadlessEngine(grid_width=20, grid_height=20,
+                                eraser_enabled=False)
+        for x in range(20):
+            engine.game.grid.grid[x, 19] = "black"
+        result = engine.step(headless.DROP)
+        self.assertEqual(result, (3, 700, True, False))
+
+    def test_gravity(self):
+        engine = HeadlessEngine(figure_types={1}, grid_width=10,
+                                grid_height=10, gravity=2)
+        y = engine.game.current_figure_y
+        engine.step(headless.LEFT)
+        engine.step(headless.RIGHT)
+        self.assertEqual(engine.game.current_figure_y, y + 1)
+
+    def test_run_until_game_over(self):
+        engine = HeadlessEngine(grid_width=10, grid_height=10)
+        results = list(engine.run(headless.DROP for _ in range(1000)))
+        self.assertLess(len(results), 1000)
+        self.assertTrue(results[-1].game_over)
+        self.assertFalse(any(result.game_over for result in results[:-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
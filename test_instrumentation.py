@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import tempfile
+import unittest
+
+from game import cells, headless
+from game.headless import HeadlessEngine
+from game.instrumentation import Instrumentation, TimingHistogram
+from game.pentrix_game import PentrixGame
+from game.scheduler import GameScheduler
+
+
+def create_game(instrumentation, **kwargs):
+    return PentrixGame(figure_types={1}, grid_width=4, grid_height=6,
+                       eraser_enabled=False, time_bomb_enabled=False,
+                       instrumentation=instrumentation, **kwargs)
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        self.time += 0.001
+        return self.time
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_create_wrong(self):
+        self.assertRaises(ValueError, Instrumentation, dump_interval=0)
+
+    def test_histogram(self):
+        histogram = TimingHistogram()
+        self.assertIsNone(histogram.get_percentile(0.5))
+        for seconds in (0.5e-6, 3e-6, 3e-6, 100e-6):
+            histogram.add(seconds)
+        snapshot = histogram.get_snapshot()
+        self.assertEqual(snapshot["count"], 4)
+        self.assertEqual(snapshot["min"], 0.5e-6)
+        self.assertEqual(snapshot["max"], 100e-6)
+        self.assertEqual(snapshot["buckets"][:3], [1, 0, 2])
+        self.assertEqual(snapshot["buckets"][7], 1)
+        self.assertEqual(snapshot["p50"], 4e-6)
+        self.assertEqual(snapshot["p99"], 100e-6)
+
+    def test_disabled(self):
+        game = create_game(None)
+        self.assertIsNone(game.instrumentation)
+        self.assertNotIn("loop", vars(game))
+
+    def test_counters(self):
+        instrumentation = Instrumentation()
+        game = create_game(instrumentation)
+        game.try_move_left()
+        game.try_move_right()
+        game.try_rotate()
+        x = game.current_figure_x
+        for column in range(4):
+            if column != x:
+                game.grid.grid[column, 5] = "red"
+        game.drop_current_figure()
+        counters = instrumentation.counters
+        self.assertEqual(counters["drops"], 1)
+        self.assertEqual(counters["rotations"], 1)
+        self.assertEqual(counters["line_clears_1"], 1)
+        self.assertEqual(counters["moves"] + counters["failed_moves"], 4)
+        self.assertGreaterEqual(counters["failed_moves"], 1)
+        timings = instrumentation.get_snapshot()["timings"]
+        self.assertEqual(timings["drop_current_figure"]["count"], 1)
+        self.assertEqual(timings["summarize_figure_flight"]["count"], 1)
+        self.assertEqual(timings["try_move_down"]["count"], 1)
+
+    def test_explosions_and_eraser(self):
+        instrumentation = Instrumentation()
+        game = create_game(instrumentation)
+        color_index = game.grid.palette.get_index("red")
+        for x in range(2):
+            game.grid.set_code(x, 5, cells.encode(cells.TIME_BOMB,
+                                                  color_index, 1))
+        game.update_time_bombs()
+        self.assertEqual(instrumentation.counters["explosions"], 2)
+        game.grid.grid[game.current_figure_x, 4] = "red"
+        game.current_figure_code = cells.encode(cells.ERASER, color_index)
+        game.drop_current_figure()
+        self.assertEqual(instrumentation.counters["eraser_cells_erased"], 1)
+
+    def test_headless_actions(self):
+        instrumentation = Instrumentation()
+        engine = HeadlessEngine(game=create_game(instrumentation))
+        for action in headless.ACTIONS:
+            engine.step(action)
+        timings = instrumentation.get_snapshot()["timings"]
+        for name in headless.ACTIONS.values():
+            self.assertGreaterEqual(timings[name]["count"], 1)
+        self.assertEqual(timings["try_rotate"]["count"], 1)
+        self.assertEqual(timings["drop_current_figure"]["count"], 1)
+        self.assertEqual(instrumentation.counters["drops"], 1)
+
+    def test_scheduler_actions(self):
+        instrumentation = Instrumentation()
+        scheduler = GameScheduler(create_game(instrumentation),
+                                  clock=lambda: 0.0)
+        for action in headless.ACTIONS:
+            scheduler.queue_input(action)
+        scheduler.tick()
+        timings = instrumentation.get_snapshot()["timings"]
+        for name in headless.ACTIONS.values():
+            self.assertGreaterEqual(timings[name]["count"], 1)
+        scheduler.close()
+
+    def test_dump(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "stats.jsonl")
+            instrumentation = Instrumentation(path, dump_interval=0.01,
+                                              clock=FakeClock())
+            game = create_game(instrumentation)
+            for _ in range(5):
+                game.loop()
+            instrumentation.dump()
+            with open(path) as file:
+                records = [json.loads(line) for line in file]
+            self.assertGreater(len(records), 1)
+            self.assertEqual(records[-1]["timings"]["loop"]["count"], 5)
+            self.assertEqual(records[-1]["counters"],
+                             dict(instrumentation.counters))
+        instrumentation.reset()
+        self.assertFalse(instrumentation.counters)
+        self.assertFalse(instrumentation.timings)
+
+
+if __name__ == "__main__":
+    unittest.main()
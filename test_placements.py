@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import itertools
+import unittest
+
+from ai import placements
+from ai.placements import Placement, PlacementEvaluator, PlacementPolicy
+from game import headless
+from game.figures import Figure
+from game.pentrix_game import PentrixGame
+from game.selfplay import play_game
+
+
+class TestPlacements(unittest.TestCase):
+    def test_enumerate_placements(self):
+        board = [0] * 6
+        figure = Figure({(0, 0), (1, 0), (2, 0)})
+        found = placements.enumerate_placements(board, 4, figure, 0, 1, -1)
+        self.assertEqual(sorted(found), [Placement(0, 0, 5),
+                                         Placement(0, 1, 5),
+                                         Placement(1, 0, 3),
+                                         Placement(1, 1, 3),
+                                         Placement(1, 2, 3),
+                                         Placement(1, 3, 3)])
+
+    def test_enumerate_blocked(self):
+        board = [0, 0, 0b0100, 0, 0, 0]
+        figure = Figure({(0, 0)})
+        found = placements.enumerate_placements(board, 4, figure, 0, 1, 2)
+        self.assertEqual(sorted(found), [Placement(0, 0, 5),
+                                         Placement(0, 1, 5)])
+
+    def test_rotate_after_move(self):
+        board = [0, 0, 0b0001, 0, 0, 0]
+        figure = Figure({(0, 0), (1, 0), (2, 0)})
+        reachable = placements.get_reachable_positions(board, 4, figure,
+                                                       0, 0, 0)
+        self.assertNotIn((1, 0), reachable)
+        self.assertEqual(reachable[1, 1], headless.RIGHT)
+        self.assertIsNone(reachable[0, 0])
+        found = placements.enumerate_placements(board, 4, figure, 0, 0, 0)
+        self.assertEqual(sorted(found), [Placement(0, 0, 1),
+                                         Placement(0, 1, 5),
+                                         Placement(1, 1, 3),
+                                         Placement(1, 2, 3),
+                                         Placement(1, 3, 3)])
+        self.assertEqual(placements.get_reachable_positions(
+            board, 4, figure, 1, 0, 0), dict())
+
+    def test_evaluate_placements(self):
+        board = [0, 0, 0, 0b0100, 0b1100]
+        figure = Figure({(0, 0), (0, 1), (1, 1)})
+        found = placements.enumerate_placements(board, 4, figure, 0, 0, -2)
+        found.append(Placement(0, 0, -1))
+        weight_vector = placements.get_weight_vector(
+            placements.DEFAULT_WEIGHTS)
+        expected = list()
+        for rotation, x, y in found:
+            features = placements.get_placement_features(
+                board, 4, figure.rotation_row_masks[rotation], x, y)
+            expected.append(placements.LOSS_SCORE if features is None
+                            else sum(weight * value for weight, value
+                                     in zip(weight_vector, features)))
+        scores = placements.evaluate_placements(board, 4, figure, found)
+        self.assertEqual(len(scores), len(found))
+        for score, expected_score in zip(scores, expected):
+            self.assertAlmostEqual(score, expected_score)
+
+    def test_get_landing_y(self):
+        board = [0, 0b0100, 0, 0b0010, 0b1001]
+        self.assertEqual(placements.get_column_masks(board, 4),
+                         [0b10000, 0b01000, 0b00010, 0b10000])
+        columns = placements.get_column_masks(board, 4)
+        for points in ({(0, 0), (1, 0), (1, 1), (2, 1)},
+                       {(0, 0), (1, 0), (0, 1), (0, 2), (1, 2)}):
+            figure = Figure(points)
+            for rotation, row_masks in enumerate(figure.rotation_row_masks):
+                for x, y in itertools.product(range(3), range(-3, 2)):
+                    if not placements.fits(board, 4, row_masks, x, y):
+                        continue
+                    falling_y = y
+                    while placements.fits(board, 4, row_masks, x,
+                                          falling_y + 1):
+                        falling_y += 1
+                    self.assertEqual(placements.get_landing_y(
+                        columns, 5, figure.rotation_bottoms[rotation], x, y),
+                        falling_y)
+
+    def test_get_placement_features(self):
+        board = [0, 0, 0, 0b0001, 0b1110]
+        features = placements.get_placement_features(board, 4, (0b1,), 0, 4)
+        self.assertEqual(features, (1, 1, 1, 0, 1))
+        self.assertIsNone(
+            placements.get_placement_features(board, 4, (0b1,), 0, -1))
+
+    def test_wrong_weights(self):
+        self.assertRaises(ValueError, PlacementEvaluator, {"speed": 1})
+
+    def test_evaluator_clears_line(self):
+        game = PentrixGame(figure_types={1}, grid_width=4, grid_height=6,
+                           eraser_enabled=False, time_bomb_enabled=False)
+        for x in range(4):
+            if x != 2:
+                game.grid.grid[x, 5] = "red"
+        self.assertEqual(PlacementEvaluator().get_best_placement(game),
+                         Placement(0, 2, 5))
+
+    def test_policy(self):
+        game_kwargs = dict(grid_width=10, grid_height=20, figure_types={4},
+                           eraser_enabled=False, time_bomb_enabled=False)
+        result = play_game(1, game_kwargs, max_steps=2000,
+                           policy=PlacementPolicy())
+        self.assertGreater(result.lines_cleared, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from game import polyominoes
+
+
+class TestPolyominoes(unittest.TestCase):
+    def test_normalized_points(self):
+        self.assertEqual(
+            polyominoes.get_normalized_points({(-1, -1), (-2, -1), (-1, 0)}),
+            ((0, 0), (1, 0), (1, 1)))
+
+    def test_canonical_form(self):
+        l_figure = {(0, 0), (0, 1), (0, 2), (1, 2)}
+        l_rotated = {(0, 0), (1, 0), (2, 0), (0, 1)}
+        j_figure = {(1, 0), (1, 1), (1, 2), (0, 2)}
+        self.assertEqual(polyominoes.get_canonical_form(l_figure),
+                         polyominoes.get_canonical_form(l_rotated))
+        self.assertNotEqual(polyominoes.get_canonical_form(l_figure),
+                            polyominoes.get_canonical_form(j_figure))
+        self.assertEqual(
+            polyominoes.get_canonical_form(l_figure, one_sided=False),
+            polyominoes.get_canonical_form(j_figure, one_sided=False))
+
+    def test_fixed_polyominoes(self):
+        for size, amount in [(1, 1), (2, 2), (3, 6), (4, 19), (5, 63),
+                             (6, 216), (7, 760)]:
+            generated = list(polyominoes.generate_fixed_polyominoes(size))
+            self.assertEqual(len(generated), amount)
+            self.assertEqual(len(set(generated)), amount)
+
+    def test_one_sided_polyominoes(self):
+        for size, amount in [(1, 1), (2, 1), (3, 2), (4, 7), (5, 18),
+                             (6, 60), (7, 196), (8, 704)]:
+            self.assertEqual(
+                len(polyominoes.get_one_sided_polyominoes(size)), amount)
+
+    def test_free_polyominoes(self):
+        for size, amount in [(1, 1), (2, 1), (3, 2), (4, 5), (5, 12),
+                             (6, 35), (7, 108), (8, 369)]:
+            self.assertEqual(
+                len(polyominoes.get_free_polyominoes(size)), amount)
+
+    def test_wrong_size(self):
+        self.assertRaises(ValueError, list,
+                          polyominoes.generate_fixed_polyominoes(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from game import headless
+from game.pentrix_game import PentrixGame
+from game.scheduler import GameScheduler, MAX_CATCH_UP_TICKS
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+class TestGameScheduler(unittest.TestCase):
+    def create_scheduler(self, **kwargs):
+        self.clock = FakeClock()
+        self.game = PentrixGame(figure_types={1}, grid_width=10,
+                                grid_height=10, seed=1)
+        return GameScheduler(self.game, tick_rate=10, clock=self.clock,
+                             **kwargs)
+
+    def test_create_wrong(self):
+        game = PentrixGame()
+        self.assertRaises(ValueError, GameScheduler, game, tick_rate=0)
+        self.assertRaises(ValueError, GameScheduler, game, level=100)
+        self.assertRaises(ValueError, GameScheduler, game,
+                          gravity_levels=(2, 0))
+
+    def test_gravity(self):
+        scheduler = self.create_scheduler(gravity_levels=(3, 1))
+        y = self.game.current_figure_y
+        self.clock.time = 0.25
+        scheduler.update()
+        self.assertEqual(scheduler.ticks, 3)
+        self.assertEqual(self.game.current_figure_y, y + 1)
+        scheduler.level = 1
+        self.clock.time = 0.45
+        scheduler.update()
+        self.assertEqual(self.game.current_figure_y, y + 3)
+
+    def test_inputs_applied_on_tick(self):
+        scheduler = self.create_scheduler()
+        scheduler.update()
+        x = self.game.current_figure_x
+        scheduler.queue_input(headless.LEFT)
+        self.assertEqual(self.game.current_figure_x, x)
+        self.assertRaises(ValueError, scheduler.queue_input, "jump")
+        self.clock.time = 0.1
+        scheduler.update()
+        self.assertEqual(self.game.current_figure_x, x - 1)
+
+    def test_changed(self):
+        scheduler = self.create_scheduler()
+        self.assertTrue(scheduler.update())
+        self.assertFalse(scheduler.update())
+        for i in range(3):
+            scheduler.queue_input(headless.DOWN)
+        self.clock.time = 0.1
+        self.assertTrue(scheduler.update())
+
+    def test_catch_up_limit(self):
+        scheduler = self.create_scheduler()
+        self.clock.time = 1000
+        scheduler.update()
+        self.assertEqual(scheduler.ticks, MAX_CATCH_UP_TICKS)
+        self.clock.time = 1000.05
+        scheduler.update()
+        self.assertEqual(scheduler.ticks, MAX_CATCH_UP_TICKS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import os
+import random
+import subprocess
+import sys
+import unittest
+
+from game import selfplay
+
+
+class TestSelfPlay(unittest.TestCase):
+    game_kwargs = dict(grid_width=10, grid_height=10)
+
+    def test_derive_seeds(self):
+        self.assertEqual(selfplay.derive_seeds(1, 10),
+                         selfplay.derive_seeds(1, 10))
+        self.assertEqual(len(set(selfplay.derive_seeds(1, 10))), 10)
+        self.assertNotEqual(selfplay.derive_seeds(1, 10),
+                            selfplay.derive_seeds(2, 10))
+
+    def test_policy_seed(self):
+        self.assertIsNone(selfplay.get_policy_seed(None))
+        self.assertEqual(selfplay.get_policy_seed(7),
+                         selfplay.get_policy_seed(7))
+        self.assertNotEqual(random.Random(selfplay.get_policy_seed(7))
+                            .getrandbits(64),
+                            random.Random(7).getrandbits(64))
+
+    def test_create_policy(self):
+        self.assertIs(selfplay.create_policy("random"),
+                      selfplay.random_policy)
+        for name in selfplay.AI_POLICIES:
+            self.assertTrue(callable(selfplay.create_policy(name)))
+        self.assertEqual(selfplay.POLICY_NAMES,
+                         ["beam", "placement", "random"])
+
+    def test_game_does_not_import_ai(self):
+        subprocess.check_call([
+            sys.executable, "-c",
+            "import sys, game.selfplay, gui.frame_renderer; "
+            "sys.exit('ai' in sys.modules)"],
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    def test_play_game_reproducible(self):
+        result = selfplay.play_game(42, self.game_kwargs, max_steps=500)
+        self.assertEqual(result,
+                         selfplay.play_game(42, self.game_kwargs,
+                                            max_steps=500))
+        self.assertEqual(result.seed, 42)
+        self.assertLessEqual(result.steps, 500)
+
+    def test_play_games_on_pool(self):
+        seeds = selfplay.derive_seeds(0, 6)
+        in_process = list(selfplay.play_games(seeds, self.game_kwargs,
+                                              max_steps=300, workers=1))
+        on_pool = list(selfplay.play_games(seeds, self.game_kwargs,
+                                           max_steps=300, workers=2,
+                                           chunk_size=2))
+        self.assertEqual(in_process, on_pool)
+        self.assertEqual([result.seed for result in on_pool], seeds)
+
+
+if __name__ == "__main__":
+    unittest.main()
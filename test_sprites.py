@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from game import cells
+from gui.sprites import get_ghost_pixels, get_sprite_pixels
+
+
+class TestSprites(unittest.TestCase):
+    def test_normal(self):
+        self.assertEqual(get_sprite_pixels(cells.NORMAL, "red", 0, 2),
+                         [["red", "red"], ["red", "red"]])
+
+    def test_rainbow(self):
+        pixels = get_sprite_pixels(cells.RAINBOW, None, 0, 8)
+        self.assertEqual(pixels[0][0], "red")
+        self.assertEqual(pixels[7][7], "purple")
+        self.assertEqual(pixels[0][7], "green")
+
+    def test_eraser(self):
+        pixels = get_sprite_pixels(cells.ERASER, "blue", 0, 10)
+        self.assertEqual(pixels[0][5], "blue")
+        self.assertIsNone(pixels[5][5])
+
+    def test_time_bomb(self):
+        pixels = get_sprite_pixels(cells.TIME_BOMB, "red", 2, 8)
+        self.assertEqual(pixels[3][3], "red")
+        self.assertEqual(pixels[3][4], "red")
+        self.assertIsNone(pixels[4][4])
+        self.assertIsNone(pixels[4][3])
+        self.assertIsNone(pixels[0][0])
+
+    def test_ghost(self):
+        pixels = get_ghost_pixels("red", 4)
+        self.assertEqual(pixels[0], ["red"] * 4)
+        self.assertEqual(pixels[1], ["red", None, None, "red"])
+
+
+if __name__ == "__main__":
+    unittest.main()
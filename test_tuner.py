@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+from ai.tuner import CrossEntropyTuner, evaluate_weights
+
+GAME_KWARGS = dict(grid_width=8, grid_height=12, figure_types={3},
+                   eraser_enabled=False, time_bomb_enabled=False)
+
+
+class TestTuner(unittest.TestCase):
+    def create_tuner(self, **kwargs):
+        return CrossEntropyTuner(GAME_KWARGS, population_size=4,
+                                 games_per_candidate=1, max_steps=200,
+                                 workers=1, **kwargs)
+
+    def test_create_wrong(self):
+        self.assertRaises(ValueError, CrossEntropyTuner, population_size=1)
+        self.assertRaises(ValueError, CrossEntropyTuner, elite_fraction=0)
+        self.assertRaises(ValueError, CrossEntropyTuner,
+                          games_per_candidate=0)
+        self.assertRaises(ValueError, CrossEntropyTuner,
+                          feature_names=["speed"])
+
+    def test_evaluate_weights(self):
+        score = evaluate_weights({"lines_cleared": 1.0, "holes": -1.0},
+                                 [1, 2], GAME_KWARGS, max_steps=200)
+        self.assertGreaterEqual(score, 0)
+
+    def test_sample_population(self):
+        tuner = self.create_tuner()
+        population = tuner.sample_population()
+        self.assertEqual(len(population), 4)
+        self.assertEqual(set(population[0]), set(tuner.feature_names))
+        self.assertEqual(population, self.create_tuner().sample_population())
+
+    def test_step(self):
+        tuner = self.create_tuner()
+        result = tuner.step()
+        self.assertEqual(result.generation, 0)
+        self.assertEqual(tuner.generation, 1)
+        self.assertGreaterEqual(result.best_score, result.elite_score)
+        self.assertGreaterEqual(result.elite_score, result.mean_score)
+        self.assertEqual(tuner.best_weights, result.best_weights)
+        self.assertTrue(all(std > 0 for std in tuner.stds))
+
+    def test_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tuning.json")
+            tuner = self.create_tuner(checkpoint_path=path)
+            results = list(tuner.run(2))
+            self.assertEqual(len(results), 2)
+            resumed = self.create_tuner(checkpoint_path=path)
+            self.assertEqual(resumed.generation, 2)
+            self.assertEqual(resumed.means, tuner.means)
+            self.assertEqual(resumed.best_weights, tuner.best_weights)
+            self.assertEqual(resumed.history, tuner.history)
+            self.assertEqual(list(resumed.run(2)), [])
+            self.assertRaises(ValueError, CrossEntropyTuner,
+                              dict(GAME_KWARGS, grid_width=9),
+                              checkpoint_path=path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from game import zobrist
+from game.figures import Figure
+from game.zobrist import TranspositionTable
+
+
+class TestZobrist(unittest.TestCase):
+    def test_cell_keys(self):
+        self.assertEqual(zobrist.get_cell_key(5, 0), 0)
+        self.assertEqual(zobrist.get_cell_key(5, 65),
+                         zobrist.get_cell_key(5, 65))
+        self.assertNotEqual(zobrist.get_cell_key(5, 65),
+                            zobrist.get_cell_key(6, 65))
+        self.assertLess(zobrist.get_cell_key(5, 65), 1 << 64)
+
+    def test_piece_keys(self):
+        figure = Figure({(0, 0), (1, 0)})
+        self.assertEqual(zobrist.get_piece_key(figure, 0, 1, 2, 65),
+                         zobrist.get_piece_key(Figure({(0, 0), (1, 0)}),
+                                               0, 1, 2, 65))
+        self.assertNotEqual(zobrist.get_piece_key(figure, 0, 1, 2, 65),
+                            zobrist.get_piece_key(figure, 1, 1, 2, 65))
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_create_wrong(self):
+        self.assertRaises(ValueError, TranspositionTable, 0)
+
+    def test_lru(self):
+        table = TranspositionTable(2)
+        table.put(1, "a")
+        table.put(2, "b")
+        self.assertEqual(table.get(1), "a")
+        table.put(3, "c")
+        self.assertIn(1, table)
+        self.assertNotIn(2, table)
+        self.assertIsNone(table.get(2))
+        self.assertEqual(len(table), 2)
+        self.assertEqual((table.hits, table.misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()